@@ -1,7 +1,52 @@
+import os
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-from sheets_config import read_sheet, update_sheet
+from sheets_config import read_sheet_fresh, update_sheet
+from shared_data import read_sheet_shared, show_memory_report
+from steamdt_resilience import show_resilience_stats
+import backtest
+import data_export
+import rerun_profiler
+from predictor import PUMP_THRESHOLD
+
+@st.cache_data(ttl=3600)
+def measured_accuracy(w_abs, w_div, threshold, history_mtime):
+    """Backtested hit rate for the live strategy; history_mtime busts the cache on new data"""
+    return backtest.measure_accuracy(backtest.load_history(), {'abs': w_abs, 'div': w_div}, threshold, workers=1)
+
+LIFETIME_EXPIRY = "2099-12-31"
+# Bulk expiry presets: days from today, None = lifetime, "requested" = what the user asked for
+EXPIRY_PRESETS = {
+    "As Requested": "requested",
+    "30 Days": 30,
+    "90 Days": 90,
+    "180 Days": 180,
+    "365 Days": 365,
+    "♾️ Lifetime": None,
+}
+
+def preset_expiry(preset, row):
+    """Expiry date string for a bulk preset applied to one pending request"""
+    days = EXPIRY_PRESETS[preset]
+    if days is None: return LIFETIME_EXPIRY
+    if days == "requested":
+        try:
+            days = int(str(row.get('Requested Duration', '')).split()[0])
+        except (ValueError, IndexError):
+            days = 30
+    return (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
+
+def apply_approvals(df, staged):
+    """Apply staged {email: (status, expiry)} decisions to still-pending rows"""
+    df = df.copy()
+    for email, (action, expiry) in staged.items():
+        rows = df.index[(df['Email'] == email) & (df['Status'] == 'Pending')]
+        df.loc[rows, 'Status'] = action
+        if action == "Approved":
+            df.loc[rows, 'Session'] = "Offline"
+            df.loc[rows, 'Expiry'] = expiry
+    return df
 
 def safe_sheet_operation(operation):
     """Wrapper for safe sheet operations"""
@@ -21,8 +66,7 @@ def show_command_center(conn):
     try:
         # 1. FETCH & CLEAN
         try:
-            df = read_sheet("CSGO_Database", "Sheet1")
-            df = df.fillna("")
+            df = read_sheet_shared("CSGO_Database", "Sheet1", clean=True)
         except Exception as e:
             st.error("Cannot connect to Google Sheets. Please check:")
             st.code(str(e))
@@ -31,11 +75,38 @@ def show_command_center(conn):
         
         # --- 🚨 PENDING REQUESTS ALERT SYSTEM ---
         pending_users = df[df['Status'] == 'Pending']
-        
+        # Staged decisions keyed by email, committed together in one sheet write
+        queue = st.session_state.setdefault("approval_queue", {})
+
+        if st.session_state.get("approval_result"):
+            st.success(st.session_state.pop("approval_result"))
+
         if not pending_users.empty:
             with st.container(border=True):
                 st.error(f"🔔 ACTION REQUIRED: {len(pending_users)} New User Request(s)")
-                
+
+                # BULK STAGING
+                b1, b2, b3 = st.columns([2, 1.5, 1.5])
+                with b1:
+                    selected = st.multiselect(
+                        "Select Requests",
+                        options=pending_users['Email'].tolist(),
+                        format_func=lambda e: f"{pending_users.loc[pending_users['Email'] == e, 'Name'].iloc[0]} ({e})",
+                        label_visibility="collapsed",
+                        placeholder="Select requests..."
+                    )
+                with b2:
+                    preset = st.selectbox("Expiry Preset", list(EXPIRY_PRESETS), label_visibility="collapsed")
+                with b3:
+                    s1, s2 = st.columns(2)
+                    if s1.button("✅ All", use_container_width=True, disabled=not selected):
+                        for email in selected:
+                            row = pending_users[pending_users['Email'] == email].iloc[0]
+                            queue[email] = ("Approved", preset_expiry(preset, row))
+                    if s2.button("❌ All", use_container_width=True, disabled=not selected):
+                        for email in selected:
+                            queue[email] = ("Denied", "")
+
                 # Loop through each pending user
                 for index, row in pending_users.iterrows():
                     st.divider() # Separator between users
@@ -43,7 +114,10 @@ def show_command_center(conn):
                     
                     with c1:
                         st.markdown(f"**{row['Name']}**")
-                        st.caption(f"📧 {row['Email']}")
+                        st.caption(f"📧 {row['Email']} · requested {row.get('Requested Duration', '') or 'n/a'}")
+                        if row['Email'] in queue:
+                            action, expiry = queue[row['Email']]
+                            st.caption(f"🕒 Staged: {action}" + (f" until {expiry}" if expiry else ""))
                         
                     with c2:
                         # OPTION 1: Pick Exact Date
@@ -60,29 +134,44 @@ def show_command_center(conn):
                         is_lifetime = st.checkbox("♾️ Lifetime Access", key=f"life_{index}")
 
                     with c3:
-                        # APPROVE BUTTON
+                        # APPROVE BUTTON (staged)
                         if st.button("✅ Approve", key=f"app_{index}", use_container_width=True):
                             # Logic: Lifetime overrides date picker
-                            if is_lifetime:
-                                final_expiry = "2099-12-31"
-                            else:
-                                final_expiry = picked_date.strftime("%Y-%m-%d")
-                                
-                            df.at[index, 'Status'] = "Approved"
-                            df.at[index, 'Session'] = "Offline"
-                            df.at[index, 'Expiry'] = final_expiry
-                            
-                            update_sheet("CSGO_Database", "Sheet1", df)
-                            st.success(f"Approved {row['Name']} until {final_expiry}!")
+                            final_expiry = LIFETIME_EXPIRY if is_lifetime else picked_date.strftime("%Y-%m-%d")
+                            queue[row['Email']] = ("Approved", final_expiry)
                             st.rerun()
 
-                        # DENY BUTTON
+                        # DENY BUTTON (staged)
                         if st.button("❌ Deny", key=f"deny_{index}", use_container_width=True):
-                            df.at[index, 'Status'] = "Denied"
-                            update_sheet("CSGO_Database", "Sheet1", df)
-                            st.warning(f"Denied {row['Name']}.")
+                            queue[row['Email']] = ("Denied", "")
                             st.rerun()
 
+                # PENDING CHANGES
+                staged = {e: v for e, v in queue.items() if e in set(pending_users['Email'])}
+                if staged:
+                    st.divider()
+                    st.markdown(f"**🕒 Pending Changes ({len(staged)})**")
+                    names = pending_users.set_index('Email')['Name']
+                    st.dataframe(
+                        pd.DataFrame(
+                            [{"Name": names.get(e, ""), "Email": e, "Action": a, "Expiry": x} for e, (a, x) in staged.items()]
+                        ),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                    q1, q2 = st.columns(2)
+                    if q1.button(f"💾 Commit {len(staged)} Change(s)", type="primary", use_container_width=True):
+                        # Re-read right before the full rewrite so sign-ups and logins since this rerun survive
+                        df = apply_approvals(read_sheet_fresh("CSGO_Database", "Sheet1").fillna(""), staged)
+                        update_sheet("CSGO_Database", "Sheet1", df)
+                        st.session_state.approval_queue = {}
+                        approved = sum(1 for a, _ in staged.values() if a == "Approved")
+                        st.session_state.approval_result = f"Committed {approved} approval(s) and {len(staged) - approved} denial(s)."
+                        st.rerun()
+                    if q2.button("🗑️ Clear Queue", use_container_width=True):
+                        st.session_state.approval_queue = {}
+                        st.rerun()
+
         # 2. METRICS
         c1, c2, c3, c4 = st.columns(4)
         c1.metric("Active Sessions", len(df[df['Session'] == 'Online']))
@@ -124,14 +213,35 @@ def show_command_center(conn):
 
         st.divider()
         
+        # 5. DATA EXPORT & DIAGNOSTICS
+        data_export.show_export_panel()
+
+        with st.expander("🩺 Rerun Profiler"):
+            enabled = st.toggle("Profile every rerun (all sessions)", value=rerun_profiler.is_enabled())
+            if enabled != rerun_profiler.is_enabled():
+                rerun_profiler.set_enabled(enabled)
+            reports = rerun_profiler.list_reports()
+            if reports:
+                st.caption(f"{len(reports)} slowest rerun(s) kept in `{rerun_profiler.PROFILE_DIR}/`, open them at speedscope.app")
+                for path, ms in reports[:10]:
+                    with open(path, "rb") as f:
+                        st.download_button(f"{ms:,.0f} ms · {os.path.basename(path)}", f.read(),
+                                           file_name=os.path.basename(path), key=f"prof_{path}")
+            else:
+                st.caption("No reports yet.")
+
+        show_memory_report()
+        show_resilience_stats()
+
+        st.divider()
+
         # 6. PREDICTIONS MANAGEMENT SECTION
         st.markdown("### 🔮 Predictions Management")
         
         try:
             # Fetch predictions
             try:
-                predictions_df = read_sheet("CSGO_Database", "Predictions")
-                predictions_df = predictions_df.fillna("")
+                predictions_df = read_sheet_shared("CSGO_Database", "Predictions", clean=True)
             except Exception as e:
                 st.warning("Creating new Predictions worksheet...")
         except:
@@ -154,7 +264,12 @@ def show_command_center(conn):
                 new_status = st.selectbox("Status", ["Active", "Inactive", "Archived"])
             with col2:
                 new_desc = st.text_area("Description")
-                new_accuracy = st.slider("Accuracy (%)", 0, 100, 85)
+                history_mtime = os.path.getmtime(backtest.HISTORY_FILE) if os.path.exists(backtest.HISTORY_FILE) else 0
+                new_accuracy = measured_accuracy(
+                    st.session_state.get('w_abs', 0.4), st.session_state.get('w_div', 0.3),
+                    st.session_state.get('pump_threshold', PUMP_THRESHOLD), history_mtime
+                )
+                st.metric("Measured Accuracy", f"{new_accuracy:.1f}%" if new_accuracy is not None else "No signals yet")
             
             new_confidence = st.selectbox("Confidence Level", ["Low", "Medium", "High"])
             
@@ -165,7 +280,7 @@ def show_command_center(conn):
                         "Title": new_title,
                         "Description": new_desc,
                         "Status": new_status,
-                        "Accuracy": new_accuracy,
+                        "Accuracy": new_accuracy if new_accuracy is not None else "",
                         "Confidence": new_confidence,
                         "Date": datetime.now().strftime("%Y-%m-%d")
                     }
@@ -187,7 +302,7 @@ def show_command_center(conn):
                 column_config={
                     "Status": st.column_config.SelectboxColumn("Status", options=["Active", "Inactive", "Archived"]),
                     "Confidence": st.column_config.SelectboxColumn("Confidence", options=["Low", "Medium", "High"]),
-                    "Accuracy": st.column_config.NumberColumn("Accuracy (%)", min_value=0, max_value=100)
+                    "Accuracy": st.column_config.NumberColumn("Accuracy (%)", min_value=0, max_value=100, disabled=True)
                 }
             )
             
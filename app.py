@@ -3,10 +3,17 @@ import pandas as pd
 import requests
 import os
 import datetime
-import json
 import time
 import urllib.parse
 import numpy as np
+from steamdt_api import SteamdtAPI
+from steamdt_resilience import UpstreamError, get_guard
+from price_refresh import refresh_portfolio
+from name_resolver import get_resolver
+from name_facets import get_facet_index
+from valuation import get_valuation
+from rerun_profiler import profile_rerun
+from live_prices import show_live_prices
 
 # --- CONFIGURATION ---
 CSV_FILE = "portfolio.csv"
@@ -22,17 +29,6 @@ def load_api_key():
 def save_api_key(key):
     with open(CONFIG_FILE, "w") as f: f.write(key.strip())
 
-@st.cache_data(ttl=3600)
-def load_local_database():
-    if not os.path.exists(DB_FILE): return None, "❌ Database Not Found"
-    try:
-        with open(DB_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if isinstance(data, list):
-            return { (item.get("name") or item.get("market_hash_name")): item for item in data }, None
-        return data, None
-    except Exception as e: return None, str(e)
-
 def load_portfolio():
     # Updated required columns to prevent "nothing there" errors
     required = ["Item Name", "Type", "AT Price", "AT Supply", "Sess Price", "Sess Supply", "Price (CNY)", "Supply", "Last Updated"]
@@ -47,42 +43,113 @@ def save_portfolio(df):
     df.to_csv(CSV_FILE, index=False)
 
 def fetch_market_data(item_hash, api_key):
+    guard = get_guard("steamdt")
+    key = ("single", item_hash)
+    headers = {"Authorization": f"Bearer {api_key}"}
+    params = {"marketHashName": item_hash}
     try:
-        headers = {"Authorization": f"Bearer {api_key}"}
-        params = {"marketHashName": item_hash}
-        r = requests.get(STEAMDT_BASE_URL, params=params, headers=headers, timeout=15)
-        if r.status_code == 200:
-            res = r.json()
-            data = res.get("data", [])
-            item_meta = res.get("item", {})
-            if not data: return None, "Not Found"
-            price = next((m['sellPrice'] for m in data if m['platform'] == "BUFF"), data[0]['sellPrice'])
-            supply = item_meta.get('quantity', sum(m.get("sellCount", 0) for m in data))
-            return {"price": price, "supply": supply, "updated": datetime.datetime.now().strftime("%Y-%m-%d %H:%M")}, None
-        return None, f"Error {r.status_code}"
-    except: return None, "Request Failed"
+        r = guard.request(lambda timeout: requests.get(STEAMDT_BASE_URL, params=params, headers=headers, timeout=timeout))
+    except UpstreamError as e:
+        # Fail fast with the last known quote while Steamdt is unhealthy
+        cached = guard.cached(key)
+        return ({**cached, "cached": True}, None) if cached else (None, f"Steamdt unavailable: {e}")
+    if r.status_code != 200: return None, f"Error {r.status_code}"
+    try:
+        res = r.json()
+    except ValueError:
+        return None, "Malformed Response"
+    data = res.get("data", [])
+    item_meta = res.get("item", {})
+    if not data: return None, "Not Found"
+    price = next((m['sellPrice'] for m in data if m['platform'] == "BUFF"), data[0]['sellPrice'])
+    supply = item_meta.get('quantity', sum(m.get("sellCount", 0) for m in data))
+    result = {"price": price, "supply": supply, "updated": datetime.datetime.now().strftime("%Y-%m-%d %H:%M")}
+    guard.remember(key, result)
+    return result, None
+
+def main():
+    st.set_page_config(page_title="JDL Terminal Pro", layout="wide")
+    if "api_key" not in st.session_state: st.session_state.api_key = load_api_key()
+
+    resolver = get_resolver(DB_FILE)
+    facets = get_facet_index(DB_FILE)
+    st.title("📟 JDL Intelligence Terminal")
+    df_raw = load_portfolio()
+    # Shared by every session and rebuilt when portfolio.csv changes underneath it
+    shared = get_valuation(CSV_FILE)
+
+    # Refresh All: batched price pass with a single write
+    if st.button("🔄 Refresh All") and not df_raw.empty:
+        with st.spinner(f"Refreshing {len(df_raw)} items..."):
+            _, failed, cached = refresh_portfolio(SteamdtAPI(st.session_state.api_key), CSV_FILE)
+        if failed: st.warning(f"Could not price {len(failed)} item(s): {', '.join(failed[:10])}")
+        if cached: st.info(f"Steamdt unavailable: {len(cached)} item(s) kept their last fetched price and time")
+        df_raw = load_portfolio()
+
+    valuation = shared.get()
+    totals = valuation.totals()
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Portfolio Value", f"¥{totals['value']:,.2f}")
+    m2.metric("Cost Basis", f"¥{totals['cost']:,.2f}")
+    m3.metric("Unrealized P&L", f"¥{totals['pnl']:,.2f}", f"{totals['pnl_pct']:.2f}%")
+    if not df_raw.empty:
+        show_live_prices(df_raw["Item Name"].astype(str), "⚡ Live Portfolio Prices", st.session_state.api_key or None)
+    with st.expander("Breakdown"):
+        group = st.radio("Group by", ["Type", "Category", "Weapon", "Wear"], horizontal=True)
+        if group == "Type":
+            st.dataframe(valuation.by_type(), use_container_width=True, hide_index=True)
+        else:
+            facet = group.lower()
+            st.dataframe(valuation.by_group(lambda name: facets.value(name, facet) or "—", group),
+                         use_container_width=True, hide_index=True)
+        if st.button("🧮 Verify Totals"):
+            issues = valuation.verify(df_raw)
+            if issues:
+                st.error("\n".join(issues))
+            else:
+                st.success("Running totals match a full recompute")
 
-st.set_page_config(page_title="JDL Terminal Pro", layout="wide")
-if "api_key" not in st.session_state: st.session_state.api_key = load_api_key()
+    # Add Item Logic
+    if resolver.names:
+        f1, f2, f3 = st.columns(3)
+        categories = f1.multiselect("Category", facets.options("category"))
+        weapons = f2.multiselect("Weapon", [w for w in facets.options("weapon", facets.select(category=categories)) if w])
+        wears = f3.multiselect("Wear", [w for w in facets.values["wear"] if w])
+        filtered = bool(categories or weapons or wears)
+        allowed = facets.mask(category=categories, weapon=weapons, wear=wears) if filtered else None
 
-DB_DATA, DB_ERROR = load_local_database()
-st.title("📟 JDL Intelligence Terminal")
-df_raw = load_portfolio()
+        query = st.text_input("Search Item", placeholder="e.g. awp asiimov ft")
+        exact = resolver.resolve(query) if query else None
+        if exact and allowed is not None and not allowed[facets.ids[exact]]: exact = None
+        if exact:
+            matches = [exact]
+        elif query:
+            matches = resolver.suggest(query, k=25, allowed=allowed)
+        else:
+            # No text: browse the filtered catalog
+            matches = [facets.names[i] for i in np.flatnonzero(allowed)[:200]] if filtered else []
+        selected_item = st.selectbox("Select Item", options=[""] + matches)
+        if st.button("Add Item"):
+            if selected_item:
+                init, err = fetch_market_data(selected_item, st.session_state.api_key)
+                if init:
+                    new_row = {
+                        "Item Name": selected_item, "Type": "Watchlist", 
+                        "AT Price": init["price"], "AT Supply": init["supply"], 
+                        "Sess Price": init["price"], "Sess Supply": init["supply"], 
+                        "Price (CNY)": init["price"], "Supply": init["supply"], 
+                        "Last Updated": init["updated"]
+                    }
+                    with shared.writing() as valuation:
+                        df_raw = pd.concat([load_portfolio(), pd.DataFrame([new_row])], ignore_index=True)
+                        save_portfolio(df_raw)
+                        valuation.add_position(selected_item, "Watchlist", init["price"], init["price"])
+                    if init.get("cached"):
+                        st.warning(f"Steamdt unavailable: {selected_item} was added at its cached price from {init['updated']}")
+                    else:
+                        st.rerun()
 
-# Add Item Logic
-if DB_DATA:
-    selected_item = st.selectbox("Select Item", options=[""] + list(DB_DATA.keys()))
-    if st.button("Add Item"):
-        if selected_item:
-            init, err = fetch_market_data(selected_item, st.session_state.api_key)
-            if init:
-                new_row = {
-                    "Item Name": selected_item, "Type": "Watchlist", 
-                    "AT Price": init["price"], "AT Supply": init["supply"], 
-                    "Sess Price": init["price"], "Sess Supply": init["supply"], 
-                    "Price (CNY)": init["price"], "Supply": init["supply"], 
-                    "Last Updated": init["updated"]
-                }
-                df_raw = pd.concat([df_raw, pd.DataFrame([new_row])], ignore_index=True)
-                save_portfolio(df_raw)
-                st.rerun()
\ No newline at end of file
+# Streamlit runs this file as __main__; importing it (item_monitor) must not render the page
+if __name__ == "__main__":
+    with profile_rerun("app"):
+        main()
@@ -0,0 +1,153 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence, Tuple
+from predictor import PUMP_THRESHOLD, score_arrays
+from baselines import HISTORY_FILE, load_history
+
+DEFAULT_THRESHOLDS = (50, 60, 70, 80, 90)
+# Grids bigger than this are split across worker processes
+PARALLEL_MIN_WEIGHTS = 64
+# Upper bound on weight-sets x observations scored at once inside a worker
+MAX_CELLS = 20_000_000
+
+def build_panel(history: pd.DataFrame, freq: str = "1h") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resample history onto a regular time grid
+
+    Returns:
+        (price, supply) arrays shaped [time, item], forward-filled, NaN before first sighting
+    """
+    if history.empty: return np.empty((0, 0)), np.empty((0, 0))
+    frames = []
+    for col in ("Price (CNY)", "Supply"):
+        wide = history.pivot_table(index="Date", columns="Item Name", values=col, aggfunc="last")
+        frames.append(wide.resample(freq).last().ffill())
+    price, supply = frames
+    supply = supply.reindex(index=price.index, columns=price.columns)
+    return price.to_numpy(dtype=float), supply.to_numpy(dtype=float)
+
+def _observations(price: np.ndarray, supply: np.ndarray, lookback: int, horizon: int):
+    """
+    Flatten every (time, item) cell that has both a baseline and a forward price
+
+    Baseline is `lookback` steps back (0 = first sighting, like AT Price),
+    forward return is measured `horizon` steps ahead.
+    """
+    T = price.shape[0]
+    if T <= horizon or (lookback and T <= lookback + horizon): return np.empty(0), np.empty(0), np.empty(0)
+
+    if lookback:
+        now = slice(lookback, T - horizon)
+        e_price, e_supply = price[:T - lookback - horizon], supply[:T - lookback - horizon]
+    else:
+        now = slice(0, T - horizon)
+        first = np.argmax(~np.isnan(price), axis=0)
+        cols = np.arange(price.shape[1])
+        e_price = np.broadcast_to(price[first, cols], price[now].shape)
+        e_supply = np.broadcast_to(supply[first, cols], supply[now].shape)
+
+    c_price, c_supply = price[now], supply[now]
+    fwd_price = price[now.start + horizon:now.stop + horizon]
+
+    abs_pts = score_arrays(c_price, c_supply, e_price, e_supply, 1.0, 0.0)
+    div_pts = score_arrays(c_price, c_supply, e_price, e_supply, 0.0, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fwd_ret = fwd_price / c_price - 1
+
+    ok = np.isfinite(abs_pts) & np.isfinite(div_pts) & np.isfinite(fwd_ret) & (e_price > 0) & (e_supply > 0)
+    return abs_pts[ok], div_pts[ok], fwd_ret[ok]
+
+def _evaluate_weights(args) -> np.ndarray:
+    """Score one block of weight sets against all observations for every threshold"""
+    weights, abs_pts, div_pts, fwd_ret, thresholds = args
+    out = np.zeros((len(weights), len(thresholds), 3))
+    if abs_pts.size == 0: return out
+    hits = (fwd_ret > 0).astype(float)
+    step = max(1, MAX_CELLS // abs_pts.size)
+    for start in range(0, len(weights), step):
+        w = weights[start:start + step]
+        # [weight set, observation] scores in one broadcasted pass
+        scores = w[:, :1] * abs_pts + w[:, 1:] * div_pts
+        for j, thr in enumerate(thresholds):
+            sig = (scores >= thr).astype(float)
+            out[start:start + step, j, 0] = sig.sum(axis=1)
+            out[start:start + step, j, 1] = sig @ hits
+            out[start:start + step, j, 2] = sig @ fwd_ret
+    return out
+
+def weight_grid(step: float = 0.1) -> np.ndarray:
+    """All (w_abs, w_div) pairs on a regular grid over [0, 1]"""
+    axis = np.round(np.arange(0, 1 + step / 2, step), 4)
+    a, d = np.meshgrid(axis, axis, indexing="ij")
+    return np.column_stack([a.ravel(), d.ravel()])
+
+def run_backtest(history: pd.DataFrame, weights: Optional[np.ndarray] = None,
+                 thresholds: Sequence[float] = DEFAULT_THRESHOLDS, lookback: int = 24,
+                 horizon: int = 24, freq: str = "1h", workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Replay history through the predictor formula for every weight/threshold pair
+
+    Args:
+        history: Frame with Date, Item Name, Price (CNY), Supply
+        weights: [n, 2] array of (w_abs, w_div); defaults to a 0.1-step grid
+        thresholds: PUMP READY cut-offs to evaluate
+        lookback: Baseline distance in `freq` steps (0 = first sighting)
+        horizon: Forward return distance in `freq` steps
+        freq: Resampling frequency for the history panel
+        workers: Process count for large grids (defaults to CPU count); pass 1 from
+            inside the Streamlit server, the process pool is for the CLI
+
+    Returns:
+        One row per configuration with signal count, hit rate (%) and average forward return (%)
+    """
+    weights = weight_grid() if weights is None else np.asarray(weights, dtype=float).reshape(-1, 2)
+    thresholds = np.asarray(thresholds, dtype=float)
+    price, supply = build_panel(history, freq)
+    abs_pts, div_pts, fwd_ret = _observations(price, supply, lookback, horizon) if price.size else (np.empty(0),) * 3
+
+    if len(weights) >= PARALLEL_MIN_WEIGHTS and abs_pts.size and (workers or os.cpu_count() or 1) > 1:
+        blocks = np.array_split(weights, workers or os.cpu_count())
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(_evaluate_weights, [(b, abs_pts, div_pts, fwd_ret, thresholds) for b in blocks if len(b)])
+            stats = np.concatenate(list(parts))
+    else:
+        stats = _evaluate_weights((weights, abs_pts, div_pts, fwd_ret, thresholds))
+
+    n = stats[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hit_rate = np.where(n > 0, stats[..., 1] / n * 100, 0.0)
+        avg_ret = np.where(n > 0, stats[..., 2] / n * 100, 0.0)
+
+    return pd.DataFrame({
+        "w_abs": np.repeat(weights[:, 0], len(thresholds)),
+        "w_div": np.repeat(weights[:, 1], len(thresholds)),
+        "threshold": np.tile(thresholds, len(weights)),
+        "signals": n.ravel().astype(int),
+        "hit_rate": hit_rate.ravel().round(1),
+        "avg_fwd_return": avg_ret.ravel().round(2),
+    })
+
+def measure_accuracy(history: pd.DataFrame, weights: Dict[str, float],
+                     threshold: float = PUMP_THRESHOLD, **kwargs) -> Optional[float]:
+    """Hit rate (%) of PUMP READY signals for one configuration, None without signals"""
+    report = run_backtest(history, np.array([[weights['abs'], weights['div']]]), [threshold], **kwargs)
+    row = report.iloc[0]
+    return float(row["hit_rate"]) if row["signals"] > 0 else None
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Backtest predictor weights against price history")
+    parser.add_argument("--history", default=HISTORY_FILE)
+    parser.add_argument("--step", type=float, default=0.1, help="Weight grid spacing")
+    parser.add_argument("--lookback", type=int, default=24)
+    parser.add_argument("--horizon", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    report = run_backtest(load_history(args.history), weight_grid(args.step), lookback=args.lookback,
+                          horizon=args.horizon, workers=args.workers)
+    ranked = report[report["signals"] > 0].sort_values(["hit_rate", "avg_fwd_return"], ascending=False)
+    print(ranked.head(args.top).to_string(index=False) if not ranked.empty else "No signals in history")
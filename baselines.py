@@ -0,0 +1,172 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+import streamlit as st
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+HISTORY_FILE = "history.csv"
+HISTORY_COLUMNS = ["Date", "Item Name", "Price (CNY)", "Supply", "Sales Detected"]
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+# A baseline is "the last price seen at or before now - h", and only counts
+# if that sighting is itself no older than h before the target time
+HORIZONS: Dict[str, pd.Timedelta] = {
+    "1h": pd.Timedelta(hours=1),
+    "24h": pd.Timedelta(hours=24),
+    "7d": pd.Timedelta(days=7),
+    "30d": pd.Timedelta(days=30),
+}
+# History older than this can no longer back any horizon and is not kept in memory
+KEEP_IN_MEMORY = max(HORIZONS.values()) * 2
+# At most one history row per item per this interval; the shortest horizon needs no finer grain
+RECORD_EVERY = min(HORIZONS.values())
+
+def baseline_columns(horizon: str) -> Tuple[str, str]:
+    """('24h Price', '24h Supply') for '24h'"""
+    return f"{horizon} Price", f"{horizon} Supply"
+
+def load_history(path: str = HISTORY_FILE) -> pd.DataFrame:
+    """Load the recorded price/supply history"""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["Date", "Item Name", "Price (CNY)", "Supply"])
+    df = pd.read_csv(path)
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    return df.dropna(subset=["Date", "Item Name"])
+
+def _prepare(history: pd.DataFrame) -> pd.DataFrame:
+    """Columns and dtypes merge_asof needs, sorted by time"""
+    df = history[["Date", "Item Name", "Price (CNY)", "Supply"]].copy()
+    df["Date"] = pd.to_datetime(df["Date"]).astype("datetime64[ns]")
+    df["Item Name"] = df["Item Name"].astype(str)
+    df["Price (CNY)"] = pd.to_numeric(df["Price (CNY)"], errors="coerce")
+    df["Supply"] = pd.to_numeric(df["Supply"], errors="coerce")
+    return df.sort_values("Date", kind="stable").reset_index(drop=True)
+
+def compute_baselines(history: pd.DataFrame, names: Iterable[str], now: Optional[pd.Timestamp] = None,
+                      horizons: Dict[str, pd.Timedelta] = HORIZONS) -> pd.DataFrame:
+    """
+    Price and supply as of now - h for every item and horizon
+
+    All (item, horizon) targets go through a single merge_asof grouped by
+    item, rather than one lookup per item.
+
+    Args:
+        history: Output of load_history (any order)
+        names: Items to compute baselines for
+        now: Reference time, defaults to the current local time
+
+    Returns:
+        Frame indexed by item name with '<h> Price' / '<h> Supply' per horizon (NaN if unknown)
+    """
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    names = pd.unique(np.asarray([str(n) for n in names], dtype=object))
+    labels = list(horizons)
+    columns = [c for h in labels for c in baseline_columns(h)]
+    if not len(names) or history.empty:
+        return pd.DataFrame(np.nan, index=pd.Index(names, name="Item Name"), columns=columns)
+
+    right = history if history["Date"].dtype == "datetime64[ns]" else _prepare(history)
+    right = right.rename(columns={"Date": "Seen"})
+    left = pd.DataFrame({
+        "Item Name": np.tile(names, len(labels)),
+        "Horizon": np.repeat(labels, len(names)),
+        "At": np.repeat(np.array([now - horizons[h] for h in labels], dtype="datetime64[ns]"), len(names)),
+    }).sort_values("At", kind="stable")
+
+    joined = pd.merge_asof(left, right, left_on="At", right_on="Seen", by="Item Name", direction="backward")
+    stale = (joined["At"] - joined["Seen"]) > joined["Horizon"].map(horizons)
+    joined.loc[stale, ["Price (CNY)", "Supply"]] = np.nan
+
+    wide = joined.pivot(index="Item Name", columns="Horizon", values=["Price (CNY)", "Supply"])
+    out = pd.DataFrame(index=pd.Index(names, name="Item Name"))
+    for h in labels:
+        price_col, supply_col = baseline_columns(h)
+        out[price_col] = wide[("Price (CNY)", h)].reindex(out.index).astype(float)
+        out[supply_col] = wide[("Supply", h)].reindex(out.index).astype(float)
+    return out
+
+class BaselineEngine:
+    """
+    Price history kept in memory for baseline joins and appended to on refreshes
+
+    Reloads from disk only when history.csv was changed by someone else.
+    Only the portfolio/Items refresh paths record, in the web process; the
+    background feeder and the snapshot crawler never write here.
+    """
+
+    def __init__(self, path: str = HISTORY_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.history: Optional[pd.DataFrame] = None
+        self.last_supply: Dict[str, float] = {}
+        self.last_recorded: Dict[str, pd.Timestamp] = {}
+        self.mtime: Optional[float] = None
+
+    def _disk_mtime(self) -> Optional[float]:
+        return os.path.getmtime(self.path) if os.path.exists(self.path) else None
+
+    def _load(self):
+        mtime = self._disk_mtime()
+        if self.history is not None and mtime == self.mtime: return
+        history = _prepare(load_history(self.path))
+        self.history = history[history["Date"] >= pd.Timestamp.now() - KEEP_IN_MEMORY].reset_index(drop=True)
+        self.last_supply = history.groupby("Item Name")["Supply"].last().to_dict()
+        self.last_recorded = history.groupby("Item Name")["Date"].max().to_dict()
+        self.mtime = mtime
+
+    def record(self, quotes: pd.DataFrame, when: Optional[datetime] = None) -> int:
+        """
+        Append one history row per quote (frame indexed by name with price/supply)
+
+        Items already recorded within RECORD_EVERY are skipped, so repeated
+        refreshes add at most one row per item per hour. Sales Detected is
+        the drop in listings since the item's previous row.
+
+        Returns:
+            Rows appended
+        """
+        if quotes.empty: return 0
+        when = (when or datetime.now()).replace(second=0, microsecond=0)
+        stamp = pd.Timestamp(when)
+        with self.lock:
+            self._load()
+            cutoff = stamp - RECORD_EVERY
+            quotes = quotes[[self.last_recorded.get(n, pd.Timestamp.min) <= cutoff for n in quotes.index.astype(str)]]
+            if quotes.empty: return 0
+            names = quotes.index.astype(str)
+            supply = quotes["supply"].to_numpy(dtype=float)
+            previous = np.array([self.last_supply.get(n, np.nan) for n in names], dtype=float)
+            rows = pd.DataFrame({
+                "Date": when.strftime(DATE_FORMAT),
+                "Item Name": names,
+                "Price (CNY)": quotes["price"].to_numpy(dtype=float),
+                "Supply": supply.astype(np.int64),
+                "Sales Detected": np.nan_to_num(np.clip(previous - supply, 0, None)).astype(np.int64),
+            }, columns=HISTORY_COLUMNS)
+            rows.to_csv(self.path, mode="a", header=not os.path.exists(self.path), index=False)
+
+            self.history = pd.concat([self.history, _prepare(rows)], ignore_index=True)
+            self.last_supply.update(zip(names, supply))
+            self.last_recorded.update((n, stamp) for n in names)
+            self.mtime = self._disk_mtime()
+            return len(rows)
+
+    def baselines(self, names: Iterable[str], now: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        with self.lock:
+            self._load()
+            history = self.history
+        return compute_baselines(history, names, now)
+
+    def attach(self, df: pd.DataFrame, name_col: str = "Item Name",
+               now: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """`df` with every horizon's baseline columns joined on by item name"""
+        if df.empty or name_col not in df: return df
+        base = self.baselines(df[name_col].dropna().astype(str), now)
+        out = df.drop(columns=[c for c in base.columns if c in df.columns])
+        aligned = base.reindex(out[name_col].astype(str)).set_axis(out.index)
+        return pd.concat([out, aligned], axis=1)
+
+@st.cache_resource
+def get_baseline_engine(path: str = HISTORY_FILE) -> BaselineEngine:
+    return BaselineEngine(path)
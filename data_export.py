@@ -0,0 +1,197 @@
+import os
+import re
+import glob
+import gzip
+import time
+import secrets
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from gspread.utils import rowcol_to_a1
+from sheets_config import open_worksheet
+
+CHUNK_ROWS = 50_000
+# Exports are written under Streamlit's static folder so the browser downloads
+# them straight from disk in chunks instead of through a websocket message
+EXPORT_DIR = os.path.join("static", "exports")
+EXPORT_URL = "app/static/exports"
+EXPORT_TTL_SECONDS = 3600
+# Streamlit's app/static route answers 404 "File is too large" above 200 MB,
+# so exports are split into self-contained parts below that
+MAX_STATIC_BYTES = 200 * 1024 * 1024
+PART_BYTES = int(os.getenv("JDL_EXPORT_PART_MB", "180")) * 1024 * 1024
+
+def iter_csv(path: str, chunksize: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Stream a local CSV (history.csv, portfolio.csv) in row chunks"""
+    if not os.path.exists(path): return
+    yield from pd.read_csv(path, chunksize=chunksize)
+
+def iter_parquet(pattern: str, batch_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Stream record batches from one or more Parquet files (e.g. daily snapshots)"""
+    for path in sorted(glob.glob(pattern)):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows):
+            yield batch.to_pandas()
+
+def iter_worksheet(sheet_name: str, worksheet_name: str, chunksize: int = 5_000) -> Iterator[pd.DataFrame]:
+    """Stream a worksheet through ranged reads instead of get_all_records"""
+    worksheet = open_worksheet(sheet_name, worksheet_name)
+    header = worksheet.row_values(1)
+    if not header: return
+    last_col = rowcol_to_a1(1, len(header)).rstrip("0123456789")
+    start = 2
+    while start <= worksheet.row_count:
+        end = start + chunksize - 1
+        rows = worksheet.get(f"A{start}:{last_col}{end}")
+        if not rows: break
+        # Sheets drops trailing empty cells, so pad each row back to the header width
+        yield pd.DataFrame([r + [""] * (len(header) - len(r)) for r in rows], columns=header)
+        start = end + 1
+
+def _part_name(stem: str, ext: str, part: int) -> str:
+    return f"{stem}.{ext}" if part == 0 else f"{stem}.part{part + 1:03d}.{ext}"
+
+def write_csv(chunks: Iterator[pd.DataFrame], folder: str, stem: str, compress: bool = False,
+              max_bytes: int = PART_BYTES) -> List[Tuple[str, int]]:
+    """
+    Append chunks to CSV parts (gzip if `compress`), starting a new part,
+    with its own header, once the current one reaches `max_bytes`
+
+    Returns:
+        (file name, rows) per part written
+    """
+    ext = "csv.gz" if compress else "csv"
+    opener = gzip.open if compress else open
+    parts: List[Tuple[str, int]] = []
+    f, path, rows = None, None, 0
+    try:
+        for chunk in chunks:
+            if f is None:
+                name = _part_name(stem, ext, len(parts))
+                path, rows = os.path.join(folder, name), 0
+                f = opener(path, "wt", newline="", encoding="utf-8")
+                parts.append((name, 0))
+            chunk.to_csv(f, header=rows == 0, index=False)
+            rows += len(chunk)
+            parts[-1] = (parts[-1][0], rows)
+            f.flush()
+            if os.path.getsize(path) >= max_bytes:
+                f.close()
+                f = None
+    finally:
+        if f is not None: f.close()
+    return parts
+
+def _widen(schema: pa.Schema, other: pa.Schema) -> pa.Schema:
+    """Schema both can be cast to without loss (int -> float, null -> anything); `other` if none exists"""
+    try:
+        return pa.unify_schemas([schema, other], promote_options="permissive").with_metadata(other.metadata)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return other
+
+def write_parquet(chunks: Iterator[pd.DataFrame], folder: str, stem: str, compression: Optional[str] = "zstd",
+                  max_bytes: int = PART_BYTES) -> List[Tuple[str, int]]:
+    """
+    Write chunks as successive Parquet row groups, rolling over to a new
+    part file once the current one reaches `max_bytes`
+
+    Chunks are typed independently (an all-null or whole-number column in
+    one chunk, decimals in the next), so each chunk is cast safely to the
+    current schema, and a chunk that needs a wider one starts a new part
+    written with the widened schema.
+
+    Returns:
+        (file name, rows) per part written
+    """
+    parts: List[Tuple[str, int]] = []
+    schema, writer, path = None, None, None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if schema is not None and not table.schema.equals(schema, check_metadata=False):
+                widened = _widen(schema, table.schema)
+                if not widened.equals(schema, check_metadata=False) and writer is not None:
+                    writer.close()
+                    writer = None
+                schema = widened
+            elif schema is None:
+                schema = table.schema
+            table = table.cast(schema)
+            if writer is None:
+                name = _part_name(stem, "parquet", len(parts))
+                path = os.path.join(folder, name)
+                writer = pq.ParquetWriter(path, schema, compression=compression or "none")
+                parts.append((name, 0))
+            writer.write_table(table)
+            parts[-1] = (parts[-1][0], parts[-1][1] + len(chunk))
+            if os.path.getsize(path) >= max_bytes:
+                writer.close()
+                writer = None
+    finally:
+        if writer is not None: writer.close()
+    return parts
+
+def export(chunks: Iterator[pd.DataFrame], name: str, fmt: str = "csv", compress: bool = False):
+    """
+    Stream chunks into downloadable files under the static export folder
+
+    Args:
+        chunks: DataFrame chunks from one of the iter_* sources
+        name: Base file name (without extension)
+        fmt: "csv" or "parquet"
+        compress: gzip for CSV, zstd for Parquet
+
+    Returns:
+        [(download URL path, rows, bytes)] per part, in order
+    """
+    cleanup_exports()
+    token = secrets.token_urlsafe(16)
+    folder = os.path.join(EXPORT_DIR, token)
+    os.makedirs(folder, exist_ok=True)
+    stem = f"{re.sub(r'[^A-Za-z0-9_-]+', '_', name)}_{datetime.now().strftime('%Y%m%d_%H%M')}"
+
+    if fmt == "parquet":
+        parts = write_parquet(chunks, folder, stem, "zstd" if compress else None)
+    else:
+        parts = write_csv(chunks, folder, stem, compress)
+    return [(f"{EXPORT_URL}/{token}/{f}", rows, os.path.getsize(os.path.join(folder, f))) for f, rows in parts]
+
+def cleanup_exports(max_age: int = EXPORT_TTL_SECONDS):
+    """Delete export folders older than `max_age` seconds"""
+    cutoff = time.time() - max_age
+    for folder in glob.glob(os.path.join(EXPORT_DIR, "*")):
+        if os.path.getmtime(folder) < cutoff:
+            for f in glob.glob(os.path.join(folder, "*")): os.remove(f)
+            os.rmdir(folder)
+
+SOURCES = {
+    "Price History": lambda: iter_csv("history.csv"),
+    "Portfolio": lambda: iter_csv("portfolio.csv"),
+    "Items Sheet": lambda: iter_worksheet("CSGO_Database", "Items"),
+    "Market Snapshots": lambda: iter_parquet(os.path.join("snapshots", "snapshot_*.parquet")),
+}
+
+def show_export_panel():
+    with st.expander("📦 Data Export"):
+        c1, c2, c3 = st.columns([2, 1, 1])
+        source = c1.selectbox("Dataset", list(SOURCES))
+        fmt = c2.selectbox("Format", ["csv", "parquet"])
+        compress = c3.checkbox("Compress", value=True)
+        if st.button("Prepare Export"):
+            with st.spinner(f"Streaming {source}..."):
+                parts = export(SOURCES[source](), source, fmt, compress)
+            rows = sum(r for _, r, _ in parts)
+            if not rows:
+                st.info("Nothing to export yet.")
+                return
+            st.success(f"{rows:,} rows exported" + (f" in {len(parts)} parts" if len(parts) > 1 else ""))
+            # The static route serves files inline; `download` makes the browser save them instead
+            links = [f'<a href="{url}" download="{os.path.basename(url)}">⬇️ {os.path.basename(url)}</a> '
+                     f'({size / 1e6:,.1f} MB)' for url, _, size in parts if size <= MAX_STATIC_BYTES]
+            if links: st.markdown("<br>".join(links), unsafe_allow_html=True)
+            too_large = [os.path.basename(url) for url, _, size in parts if size > MAX_STATIC_BYTES]
+            if too_large:
+                st.error(f"{', '.join(too_large)} exceeded Streamlit's {MAX_STATIC_BYTES // 2**20} MB static file "
+                         f"limit and cannot be downloaded here; lower JDL_EXPORT_PART_MB or enable compression.")
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 import hashlib
+from shared_data import invalidate
 
 # Rate limiting configuration
 MAX_ATTEMPTS = 5
@@ -74,6 +75,7 @@ def show_login(conn):
                         df.at[idx, 'Session'] = "Online"
                         df.at[idx, 'Last Login'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                         conn.update(worksheet="Sheet1", data=df)
+                        invalidate("Sheet1")
                         
                         # --- 2. SET SESSION STATE ---
                         st.session_state.user_verified = True
@@ -133,6 +135,7 @@ def show_login(conn):
                         # Append and update
                         updated_df = pd.concat([df, new_data], ignore_index=True)
                         conn.update(worksheet="Sheet1", data=updated_df)
+                        invalidate("Sheet1")
                         st.success(f"✅ Request sent to Admin. You requested {duration[1]} days of access.")
                     except Exception as e:
                         st.error(f"Request Error: {e}")
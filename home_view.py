@@ -6,7 +6,11 @@ import os
 from datetime import datetime
 import item_monitor
 import predictor
-from sheets_config import read_sheet, update_sheet
+import screener
+from sheets_config import read_sheet, read_sheet_fresh, update_sheet
+from rerun_profiler import profiled
+from shared_data import read_worksheet
+from live_prices import LIVE_INTERVAL_OPTIONS, LIVE_INTERVAL_SECONDS
 
 # --- 1. HEARTBEAT & EXPIRY ---
 def run_heartbeat(conn):
@@ -16,8 +20,7 @@ def run_heartbeat(conn):
     if not email_param: return "No Email"
 
     try:
-        df = conn.read(worksheet="Sheet1", ttl=0)
-        df = df.fillna("")
+        df = read_worksheet(conn, "Sheet1", clean=True)
         
         # SMART MATCH: Clean both sides to ensure they match
         clean_param = email_param.strip().lower()
@@ -43,9 +46,15 @@ def run_heartbeat(conn):
             last_update = st.session_state.get('last_status_update')
             
             if not last_update or (current_time - last_update).total_seconds() > 300:
-                df.at[idx, 'Session'] = "Online"
-                df.at[idx, 'Last Login'] = current_time.strftime("%Y-%m-%d %H:%M:%S")
-                update_sheet("CSGO_Database", "Sheet1", df)
+                # The shared frame can be a minute old; stamp a fresh read so the full
+                # rewrite keeps approvals, sign-ups and logins made since then
+                fresh = read_sheet_fresh("CSGO_Database", "Sheet1").fillna("")
+                fresh_match = fresh['Email'].astype(str).str.strip().str.lower() == clean_param
+                if fresh_match.any():
+                    fresh_idx = fresh.index[fresh_match][0]
+                    fresh.at[fresh_idx, 'Session'] = "Online"
+                    fresh.at[fresh_idx, 'Last Login'] = current_time.strftime("%Y-%m-%d %H:%M:%S")
+                    update_sheet("CSGO_Database", "Sheet1", fresh)
                 st.session_state.last_status_update = current_time
             
             return "Active"
@@ -66,7 +75,7 @@ def tab_overview(conn, email):
     
     days_left = "∞"
     try:
-        df = conn.read(worksheet="Sheet1", ttl=0)
+        df = read_worksheet(conn, "Sheet1")
         # Smart Match for Display
         clean_email = email.strip().lower()
         match = df[df['Email'].astype(str).str.strip().str.lower() == clean_email]
@@ -92,6 +101,12 @@ def tab_settings(conn):
         predictor.show_strategy_tuner()
     
     st.divider()
+
+    with st.expander("⚡ Live Prices"):
+        st.session_state.live_interval = st.select_slider(
+            "Refresh live panels every (seconds)", LIVE_INTERVAL_OPTIONS,
+            value=st.session_state.get("live_interval", LIVE_INTERVAL_SECONDS))
+    st.divider()
     
     # API Key Management
     with st.expander("🔑 API Key Settings"):
@@ -115,6 +130,16 @@ def tab_settings(conn):
             st.rerun()
 
 # --- 3. MASTER INTERFACE ---
+# Label -> view. Only the selected entry runs on a rerun, unlike st.tabs which runs every body
+VIEWS = {
+    "🏠 Overview": lambda conn, email: tab_overview(conn, email),
+    "📊 Item Monitor": lambda conn, email: item_monitor.show_item_monitor(conn),
+    "📈 Permanent": lambda conn, email: predictor.show_predictor_view(conn, "Permanent"),
+    "📅 Daily": lambda conn, email: predictor.show_predictor_view(conn, "Daily"),
+    "🔭 Screener": lambda conn, email: screener.show_screener_view(),
+    "⚙️ Settings": lambda conn, email: tab_settings(conn),
+}
+
 def verify_session():
     """Verify user session is valid"""
     if not st.session_state.get("user_verified") and not st.session_state.get("admin_verified"):
@@ -122,13 +147,12 @@ def verify_session():
         st.session_state.clear()
         st.rerun()
 
+@profiled("user_interface")
 def show_user_interface(conn):
     verify_session()
     # Initialize prediction weights
     if "w_abs" not in st.session_state:
         st.session_state.w_abs = 0.4
-    if "w_mom" not in st.session_state:
-        st.session_state.w_mom = 0.3
     if "w_div" not in st.session_state:
         st.session_state.w_div = 0.3
     
@@ -142,9 +166,5 @@ def show_user_interface(conn):
         return
 
     email = st.query_params.get("u")
-    t1, t2, t3, t4, t5 = st.tabs(["🏠 Overview", "📊 Item Monitor", "📈 Permanent", "📅 Daily", "⚙️ Settings"])
-    with t1: tab_overview(conn, email)
-    with t2: item_monitor.show_item_monitor(conn)
-    with t3: predictor.show_predictor_view(conn, "Permanent")
-    with t4: predictor.show_predictor_view(conn, "Daily")
-    with t5: tab_settings(conn)
+    view = st.radio("View", list(VIEWS), horizontal=True, key="active_view", label_visibility="collapsed")
+    VIEWS[view](conn, email)
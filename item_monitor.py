@@ -1,7 +1,13 @@
+import os
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from steamdt_api import SteamdtAPI, load_api_key
+from steamdt_api import SteamdtAPI, load_api_key, save_api_key
+from price_refresh import refresh_items_sheet
+from name_resolver import get_resolver
+from shared_data import invalidate, read_worksheet
+from live_prices import show_live_prices
+from price_alerts import AlertRule, format_alert, get_alert_engine as _process_engine, load_rules, save_rules
 
 def initialize_items_database(conn):
     try:
@@ -15,19 +21,122 @@ def initialize_items_database(conn):
 
 def show_add_items_view(conn, api_key: str):
     st.subheader("Add New Item")
-    with st.form("add_item_form"):
-        name = st.text_input("Item Name")
-        if st.form_submit_button("Add Item"):
-            from app import fetch_market_data
-            init, _ = fetch_market_data(name, api_key)
-            if init:
-                items_df = conn.read(worksheet="Items", ttl=0)
-                new_item = {
-                    'Item Name': name, 'Added Date': datetime.now().strftime("%Y-%m-%d"),
-                    'AT Price': init["price"], 'AT Supply': init["supply"],
-                    'Current Price': init["price"], 'Supply': init["supply"],
-                    'Last Updated': init["updated"]
-                }
-                items_df = pd.concat([items_df, pd.DataFrame([new_item])], ignore_index=True)
-                conn.update(worksheet="Items", data=items_df)
-                st.rerun()
\ No newline at end of file
+    resolver = get_resolver()
+    query = st.text_input("Item Name", placeholder="e.g. ak redline ft, st karambit doppler fn")
+
+    # Only canonical catalog names are ever sent to Steamdt
+    name = resolver.resolve(query) if query else None
+    if query and not name:
+        matches = resolver.suggest(query)
+        if not matches:
+            st.warning("No matching item in the catalog")
+            return
+        name = st.selectbox("Did you mean", options=matches)
+
+    if st.button("Add Item", disabled=not name):
+        from app import fetch_market_data
+        init, err = fetch_market_data(name, api_key)
+        if init:
+            items_df = conn.read(worksheet="Items", ttl=0)
+            new_item = {
+                'Item Name': name, 'Added Date': datetime.now().strftime("%Y-%m-%d"),
+                'AT Price': init["price"], 'AT Supply': init["supply"],
+                'Current Price': init["price"], 'Supply': init["supply"],
+                'Last Updated': init["updated"]
+            }
+            items_df = pd.concat([items_df, pd.DataFrame([new_item])], ignore_index=True)
+            conn.update(worksheet="Items", data=items_df)
+            invalidate("Items")
+            if init.get("cached"):
+                st.warning(f"Steamdt unavailable: {name} was added at its cached price from {init['updated']}")
+            else:
+                st.rerun()
+        else:
+            st.error(f"Could not price {name}: {err}")
+
+def _member():
+    return st.session_state.get("user_email") or st.query_params.get("u") or "admin"
+
+def _user_folder():
+    return os.path.join(os.getenv("USER_DATA_DIR", "user_data"), _member())
+
+@st.cache_resource
+def get_alert_engine(_conn):
+    """The process-wide engine, with the Alerts sheet loaded into it once"""
+    engine = _process_engine()
+    for rule in load_rules(_conn): engine.add_rule(rule)
+    return engine
+
+def _rule_label(rule: AlertRule) -> str:
+    window = f" / {rule.window_minutes} min" if rule.kind in ("pct_change", "supply_drop") else ""
+    return f"{rule.item} · {rule.kind} {rule.threshold:g}{window}"
+
+def show_alert_rules(conn, engine, item_names):
+    with st.expander("🔔 Price Alerts"):
+        with st.form("add_alert_form", clear_on_submit=True):
+            c1, c2 = st.columns(2)
+            item = c1.selectbox("Item", options=item_names)
+            kind = c2.selectbox("Trigger", options=["price_above", "price_below", "pct_change", "supply_drop"])
+            threshold = c1.number_input("Threshold (¥ or %)", value=0.0)
+            window = c2.number_input("Window (min)", min_value=0, value=1440, step=60)
+            cooldown = c1.number_input("Cooldown (min)", min_value=0, value=60, step=15)
+            if st.form_submit_button("Add Alert") and item:
+                rule = AlertRule(member=_member(), item=item, kind=kind, threshold=threshold,
+                                 window_minutes=int(window), cooldown_minutes=int(cooldown))
+                if engine.add_rule(rule):
+                    save_rules(conn, engine)
+                    st.success("Alert saved")
+                else:
+                    st.info("You already have this alert")
+
+        mine = engine.rules_for(_member())
+        if mine:
+            st.dataframe(pd.DataFrame([r.model_dump() for r in mine]), use_container_width=True)
+            c1, c2 = st.columns([3, 1])
+            doomed = c1.selectbox("Remove Alert", options=range(len(mine)), format_func=lambda i: _rule_label(mine[i]))
+            if c2.button("🗑️ Delete"):
+                engine.remove_rule(mine[doomed])
+                save_rules(conn, engine)
+                st.rerun()
+
+        recent = engine.recent_alerts(_member())
+        if recent:
+            st.caption("Recent alerts")
+            st.dataframe(pd.DataFrame(recent[:20]), use_container_width=True, hide_index=True)
+
+def show_item_monitor(conn):
+    st.header("📊 Item Monitor")
+    initialize_items_database(conn)
+
+    api_key = load_api_key(_user_folder())
+    if not api_key:
+        st.info("Enter your Steamdt API Key to start monitoring")
+        key = st.text_input("Steamdt API Key", type="password")
+        if st.button("Save API Key") and key:
+            save_api_key(key, _user_folder())
+            st.rerun()
+        return
+
+    engine = get_alert_engine(conn)
+    # Alerts fired by any refresh (feeder, portfolio, other sessions) since this member last looked
+    for alert in engine.drain(_member()): st.toast(format_alert(alert))
+    items_df = None
+    if st.button("🔄 Refresh Prices"):
+        # One batched pass over the whole sheet, one write back
+        with st.spinner("Refreshing all items..."):
+            items_df, failed, cached = refresh_items_sheet(conn, SteamdtAPI(api_key))
+        if failed:
+            st.warning(f"Could not price {len(failed)} item(s): {', '.join(failed[:10])}")
+        elif not cached:
+            st.success(f"Refreshed {len(items_df)} item(s)")
+        if cached:
+            st.info(f"Steamdt unavailable: {len(cached)} item(s) kept their last fetched price and time")
+        # The refresh evaluated every member's rules; show this member's share now
+        for alert in engine.drain(_member()): st.toast(format_alert(alert))
+
+    if items_df is None: items_df = read_worksheet(conn, "Items")
+    if 'Item Name' in items_df:
+        show_live_prices(items_df['Item Name'].dropna().astype(str), api_key=api_key)
+    st.dataframe(items_df, use_container_width=True)
+    show_alert_rules(conn, engine, items_df['Item Name'].dropna().astype(str).tolist() if 'Item Name' in items_df else [])
+    show_add_items_view(conn, api_key)
@@ -0,0 +1,119 @@
+import os
+import time
+import threading
+import pandas as pd
+import streamlit as st
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# How often a live panel re-reads the store (per session, fragment-only rerun)
+LIVE_INTERVAL_SECONDS = int(os.getenv("JDL_LIVE_INTERVAL", "10"))
+LIVE_INTERVAL_OPTIONS = [5, 10, 15, 30, 60]
+# How often the background feeder asks Steamdt for the watched names (once per process)
+FEED_INTERVAL_SECONDS = int(os.getenv("JDL_FEED_INTERVAL", "60"))
+
+class PriceStore:
+    """Latest quote per item, published by refresh paths and read by live panels"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # name -> (price, supply, previous price, published at)
+        self.quotes: Dict[str, Tuple[float, int, Optional[float], float]] = {}
+        # API key -> {name: last displayed}; each key's feeder polls only its own panels' names
+        self.watched: Dict[Optional[str], Dict[str, float]] = {}
+
+    def publish(self, quotes: pd.DataFrame):
+        """Take a frame indexed by name with price/supply columns (as from fetch_quotes)"""
+        if quotes.empty: return
+        now = time.time()
+        with self.lock:
+            for name, price, supply in zip(quotes.index, quotes["price"], quotes["supply"]):
+                old = self.quotes.get(name)
+                previous = old[0] if old and old[0] != price else (old[2] if old else None)
+                self.quotes[name] = (float(price), int(supply), previous, now)
+
+    def watch(self, names: Iterable[str], owner: Optional[str] = None):
+        now = time.time()
+        with self.lock:
+            watched = self.watched.setdefault(owner, {})
+            for name in names: watched[name] = now
+
+    def watched_names(self, max_age: float, owner: Optional[str] = None) -> List[str]:
+        """Names a panel of `owner` displayed within `max_age` seconds"""
+        cutoff = time.time() - max_age
+        with self.lock:
+            return [n for n, seen in self.watched.get(owner, {}).items() if seen >= cutoff]
+
+    def frame(self, names: Iterable[str]) -> pd.DataFrame:
+        with self.lock:
+            rows = [(n,) + self.quotes[n] for n in dict.fromkeys(names) if n in self.quotes]
+        df = pd.DataFrame(rows, columns=["Item Name", "Price", "Supply", "Previous", "Updated"])
+        df["Change %"] = ((df["Price"] - df["Previous"]) / df["Previous"] * 100).round(2)
+        return df.drop(columns="Previous")
+
+@st.cache_resource
+def get_price_store() -> PriceStore:
+    return PriceStore()
+
+class PriceFeeder(threading.Thread):
+    """Polls Steamdt for the names watched under its API key and publishes to the store"""
+
+    def __init__(self, api_key: str, store: PriceStore, interval: float = FEED_INTERVAL_SECONDS):
+        super().__init__(daemon=True, name="price-feeder")
+        self.api_key = api_key
+        self.store = store
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        # Imported here: price_refresh publishes into this module's store
+        from steamdt_api import SteamdtAPI
+        from price_refresh import fetch_quotes
+        api = SteamdtAPI(self.api_key)
+        while not self._stop_event.is_set():
+            names = self.store.watched_names(max_age=self.interval * 3, owner=self.api_key)
+            if names:
+                try:
+                    fetch_quotes(api, names, max_rounds=1)
+                except Exception as e:
+                    print(f"Price Feeder Error: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+@st.cache_resource
+def start_feeder(api_key: str) -> PriceFeeder:
+    """One feeder per API key per process, however many sessions are open"""
+    feeder = PriceFeeder(api_key, get_price_store())
+    feeder.start()
+    return feeder
+
+def _live_table(names: Tuple[str, ...], title: str, api_key: Optional[str] = None):
+    store = get_price_store()
+    # Re-registered on every tick so this key's feeder keeps these names while the panel is open
+    store.watch(names, owner=api_key)
+    df = store.frame(names)
+    if df.empty:
+        st.caption(f"{title}: waiting for the first price update…")
+        return
+    age = int(time.time() - df["Updated"].max())
+    df["Updated"] = [datetime.fromtimestamp(t).strftime("%H:%M:%S") for t in df["Updated"]]
+    st.caption(f"{title} · {len(df)}/{len(names)} items · last update {age}s ago")
+    st.dataframe(df, use_container_width=True, hide_index=True,
+                 column_config={"Change %": st.column_config.NumberColumn(format="%.2f%%")})
+
+def show_live_prices(names: Iterable[str], title: str = "⚡ Live Prices", api_key: Optional[str] = None):
+    """
+    Price panel that re-renders on its own every few seconds
+
+    Only this fragment reruns on the timer; the rest of the page is left
+    alone. It reads the shared store, so polling costs no API calls; the
+    feeder for `api_key` (which only polls names shown under that key) and
+    manual refreshes keep the store current.
+    """
+    names = tuple(dict.fromkeys(n for n in names if n))
+    if not names: return
+    if api_key: start_feeder(api_key)
+    interval = st.session_state.get("live_interval", LIVE_INTERVAL_SECONDS)
+    st.fragment(_live_table, run_every=interval)(names, title, api_key)
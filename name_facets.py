@@ -0,0 +1,162 @@
+import re
+import numpy as np
+import streamlit as st
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
+from name_resolver import DB_FILE, WEARS, _WEAR_RE, load_catalog
+
+CATEGORIES = ["weapon", "knife", "gloves", "agent", "sticker", "patch", "charm", "music_kit",
+              "graffiti", "container", "collectible", "pass", "other"]
+GUNS = frozenset([
+    "AK-47", "AUG", "AWP", "CZ75-Auto", "Desert Eagle", "Dual Berettas", "FAMAS", "Five-SeveN",
+    "G3SG1", "Galil AR", "Glock-18", "M249", "M4A1-S", "M4A4", "MAC-10", "MAG-7", "MP5-SD", "MP7",
+    "MP9", "Negev", "Nova", "P2000", "P250", "P90", "PP-Bizon", "R8 Revolver", "SCAR-20", "SG 553",
+    "SSG 08", "Sawed-Off", "Tec-9", "UMP-45", "USP-S", "XM1014", "Zeus x27",
+])
+WEAPON_ALIASES = {"Deagle": "Desert Eagle"}
+# "<Prefix> | ..." items that are not weapons or agents
+PREFIX_CATEGORIES = {
+    "Sticker": "sticker", "Patch": "patch", "Charm": "charm", "Music Kit": "music_kit",
+    "Sealed Graffiti": "graffiti", "Graffiti": "graffiti", "Autograph Capsule": "container",
+}
+# Words that mark a stand-alone name (no " | ") as openable or a collectible
+CONTAINER_WORDS = {"Case", "Capsule", "Package", "Box", "Pack", "Parcel", "Challengers", "Legends", "Contenders"}
+PASS_WORDS = {"Pass", "Tokens"}
+
+_PREFIX_RE = re.compile(r"^(★ )?(StatTrak™ |Souvenir )?(★ )?")
+
+class ParsedName(NamedTuple):
+    category: str
+    weapon: str
+    skin: str
+    wear: int
+    stattrak: bool
+    souvenir: bool
+
+def parse_name(name: str) -> ParsedName:
+    """
+    Split a market hash name into its facets
+
+    '★ StatTrak™ Karambit | Doppler (Factory New)' ->
+    ('knife', 'Karambit', 'Doppler', 1, True, False)
+    """
+    found = _WEAR_RE.search(name)
+    wear = WEARS.index(found.group(1)) + 1 if found else 0
+    base = _WEAR_RE.sub("", _PREFIX_RE.sub("", name)).strip()
+    head, _, skin = (part.strip() for part in base.partition(" | "))
+    head = WEAPON_ALIASES.get(head, head)
+
+    if "Gloves" in head or head == "Hand Wraps":
+        category, weapon = "gloves", head
+    elif name.startswith("★"):
+        category, weapon, skin = "knife", head, skin or "Vanilla"
+    elif head in GUNS:
+        category, weapon = "weapon", head
+    elif head in PREFIX_CATEGORIES:
+        category, weapon = PREFIX_CATEGORIES[head], ""
+    elif not skin:
+        words = set(base.split())
+        category = ("container" if words & CONTAINER_WORDS else "collectible" if "Pin" in words
+                    else "pass" if words & PASS_WORDS else "other")
+        weapon, skin = "", base
+    else:
+        # "<Agent> | <Faction>"
+        category, weapon = "agent", ""
+    return ParsedName(category, weapon, skin, wear, "StatTrak™" in name, name.startswith("Souvenir "))
+
+def _postings(codes: np.ndarray, size: int) -> List[np.ndarray]:
+    """Sorted row ids per code, from one stable argsort"""
+    order = np.argsort(codes, kind="stable").astype(np.int32)
+    bounds = np.searchsorted(codes[order], np.arange(size + 1))
+    return [order[bounds[c]:bounds[c + 1]] for c in range(size)]
+
+class FacetIndex:
+    """
+    Columnar facet index over market hash names
+
+    Each name is parsed once. String facets (category, weapon, skin) are
+    stored as integer codes into a per-facet value list; wear is its own
+    code and stattrak/souvenir are booleans. Every facet value keeps a
+    sorted array of row ids, so a filter is a union of postings within a
+    facet and an intersection across facets.
+    """
+
+    FACETS = ("category", "weapon", "skin", "wear", "stattrak", "souvenir")
+
+    def __init__(self, names: Sequence[str]):
+        self.names = list(names)
+        self.ids: Dict[str, int] = {n: i for i, n in enumerate(self.names)}
+        parsed = [parse_name(n) for n in self.names]
+        self.values: Dict[str, List] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        for f, field in enumerate(ParsedName._fields):
+            column = [p[f] for p in parsed]
+            if field == "category":
+                values = CATEGORIES
+            elif field == "wear":
+                values = ["", *WEARS]
+            elif field in ("stattrak", "souvenir"):
+                values = [False, True]
+            else:
+                values = sorted(set(column))
+            # Wear is already parsed as its code (0 = none, 1 = Factory New ...)
+            lookup = {c: c for c in range(len(values))} if field == "wear" else {v: c for c, v in enumerate(values)}
+            dtype = np.int8 if len(values) < 128 else np.int32
+            self.values[field] = values
+            self.codes[field] = np.fromiter((lookup[v] for v in column), dtype=dtype, count=len(column))
+        self.postings = {f: _postings(self.codes[f], len(self.values[f])) for f in self.FACETS}
+
+    def __len__(self):
+        return len(self.names)
+
+    def _code(self, facet: str, value) -> Optional[int]:
+        if facet == "wear" and isinstance(value, (int, np.integer)): return int(value)
+        try:
+            return self.values[facet].index(value)
+        except ValueError:
+            return None
+
+    def select(self, **filters: Union[object, Iterable]) -> np.ndarray:
+        """
+        Sorted ids of names matching every facet filter
+
+        A list/tuple/set value means any of those values, e.g.
+        select(category="weapon", weapon=["AK-47", "M4A4"], stattrak=True).
+        Empty filters are ignored; no filters selects everything.
+        """
+        groups = []
+        for facet, wanted in filters.items():
+            if wanted is None or (isinstance(wanted, (list, tuple, set)) and not wanted): continue
+            options = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            lists = [self.postings[facet][c] for c in (self._code(facet, v) for v in options) if c is not None]
+            ids = lists[0] if len(lists) == 1 else np.unique(np.concatenate(lists)) if lists else np.empty(0, np.int32)
+            groups.append(ids)
+        if not groups: return np.arange(len(self.names), dtype=np.int32)
+        groups.sort(key=len)
+        result = groups[0]
+        for ids in groups[1:]:
+            if not result.size: break
+            result = np.intersect1d(result, ids, assume_unique=True)
+        return result
+
+    def mask(self, **filters) -> np.ndarray:
+        """Boolean row mask for select(**filters)"""
+        out = np.zeros(len(self.names), dtype=bool)
+        out[self.select(**filters)] = True
+        return out
+
+    def value(self, name: str, facet: str):
+        """Facet value for one name (parsed on the fly if it is not indexed)"""
+        i = self.ids.get(name)
+        code = getattr(parse_name(name), facet) if i is None else self.codes[facet][i]
+        if i is None and facet != "wear": return code
+        return self.values[facet][code]
+
+    def options(self, facet: str, ids: Optional[np.ndarray] = None) -> List:
+        """Facet values present among `ids` (all rows by default)"""
+        codes = self.codes[facet] if ids is None else self.codes[facet][ids]
+        return [self.values[facet][c] for c in np.unique(codes)]
+
+@st.cache_resource
+def get_facet_index(path: str = DB_FILE) -> FacetIndex:
+    """Facet index over the local catalog, row ids aligned with get_resolver(path).names"""
+    return FacetIndex(load_catalog(path))
@@ -0,0 +1,135 @@
+import os
+import re
+import json
+import numpy as np
+import streamlit as st
+from typing import Dict, List, Optional
+
+DB_FILE = os.getenv("DB_FILE", "csgo_api_v47.json")
+
+WEARS = ["Factory New", "Minimal Wear", "Field-Tested", "Well-Worn", "Battle-Scarred"]
+WEAR_ALIASES = {"fn": 1, "mw": 2, "ft": 3, "ww": 4, "bs": 5}
+# Query shorthands expanded before matching
+TOKEN_ALIASES = {"st": "stattrak", "stat": "stattrak", "sv": "souvenir", "souv": "souvenir"}
+_WEAR_RE = re.compile(r"\((" + "|".join(WEARS) + r")\)")
+_NON_ALNUM = re.compile(r"[\W_]+", re.UNICODE)
+
+def load_catalog(path: str = DB_FILE) -> List[str]:
+    """Read market hash names from the local catalog (dict, list or {"items": [...]})"""
+    if not os.path.exists(path): return []
+    with open(path, "r", encoding="utf-8-sig") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("items", list(data.keys()))
+    names = [(d.get("name") or d.get("market_hash_name")) if isinstance(d, dict) else d for d in data]
+    return sorted({n for n in names if n})
+
+def _compact(text: str) -> str:
+    """Lowercase and drop everything but letters/digits (★, ™, |, -, spaces...)"""
+    return _NON_ALNUM.sub("", text.lower())
+
+def _trigrams(compact: str) -> List[str]:
+    padded = f"^{compact}$"
+    return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+def parse_query(query: str):
+    """Split a free-text query into (compact text, wear code, stattrak?, souvenir?)"""
+    wear = 0
+    full = _WEAR_RE.search(query)
+    if full:
+        wear = WEARS.index(full.group(1)) + 1
+        query = query.replace(full.group(0), " ")
+    words = []
+    for word in _NON_ALNUM.sub(" ", query.lower().replace("™", "")).split():
+        if word in WEAR_ALIASES and not wear:
+            wear = WEAR_ALIASES[word]
+            continue
+        words.append(TOKEN_ALIASES.get(word, word))
+    text = " ".join(words)
+    for code, label in enumerate(WEARS, start=1):
+        key = _compact(label)
+        if not wear and key in _compact(text):
+            wear = code
+            text = _compact(text).replace(key, "")
+    return _compact(text), wear, "stattrak" in text, "souvenir" in text
+
+class NameResolver:
+    """
+    Trigram index over catalog market hash names
+
+    Each trigram maps to a sorted array of name ids. A query gathers its
+    postings, counts shared trigrams per name with one bincount, ranks by
+    Dice similarity and takes the top-k with a partial sort.
+    """
+
+    def __init__(self, names: List[str]):
+        self.names = names
+        self._exact: Dict[str, str] = {}
+        self._by_parts: Dict[tuple, str] = {}
+        self.wear = np.zeros(len(names), dtype=np.int8)
+        self.stattrak = np.zeros(len(names), dtype=bool)
+        self.souvenir = np.zeros(len(names), dtype=bool)
+        self.size = np.zeros(len(names), dtype=np.float32)
+        postings: Dict[str, List[int]] = {}
+
+        for i, name in enumerate(names):
+            self._exact.setdefault(_compact(name), name)
+            found = _WEAR_RE.search(name)
+            self.wear[i] = WEARS.index(found.group(1)) + 1 if found else 0
+            self.stattrak[i] = "StatTrak" in name
+            self.souvenir[i] = name.startswith("Souvenir")
+            # Index the name without its wear so "redline" and "redline ft" rank alike
+            base = _compact(_WEAR_RE.sub("", name))
+            self._by_parts.setdefault((base, int(self.wear[i])), name)
+            grams = _trigrams(base)
+            self.size[i] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+
+        self.postings = {g: np.asarray(ids, dtype=np.int32) for g, ids in postings.items()}
+
+    def resolve(self, query: str) -> Optional[str]:
+        """
+        Canonical name when the query names exactly one item
+
+        Case, spacing and ★/™/| punctuation are ignored and wear/StatTrak
+        shorthands are expanded, so "st ak47 redline ft" resolves.
+        """
+        exact = self._exact.get(_compact(query or ""))
+        if exact: return exact
+        text, wear, _, _ = parse_query(query or "")
+        return self._by_parts.get((text, wear))
+
+    def suggest(self, query: str, k: int = 10, allowed: Optional[np.ndarray] = None) -> List[str]:
+        """
+        Top-k catalog names for a free-text query
+
+        Args:
+            allowed: Optional boolean mask over catalog ids (e.g. from a facet filter)
+        """
+        text, wear, stattrak, souvenir = parse_query(query or "")
+        if not text: return []
+        hits = [self.postings[g] for g in _trigrams(text) if g in self.postings]
+        if not hits: return []
+
+        q_size = len(_trigrams(text))
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.names))
+        score = 2.0 * shared / (q_size + self.size)
+        # Honour an explicit wear and StatTrak/Souvenir intent; gently prefer plain variants otherwise
+        if wear: score = np.where(self.wear == wear, score, score * 0.5)
+        score = np.where(self.stattrak == stattrak, score, score * 0.8)
+        score = np.where(self.souvenir == souvenir, score, score * 0.8)
+        if allowed is not None:
+            shared = np.where(allowed, shared, 0)
+            score = np.where(allowed, score, -1.0)
+
+        k = min(k, int((shared > 0).sum()))
+        if k == 0: return []
+        top = np.argpartition(-score, k - 1)[:k]
+        top = top[np.lexsort((top, -score[top]))]
+        return [self.names[i] for i in top]
+
+@st.cache_resource
+def get_resolver(path: str = DB_FILE) -> NameResolver:
+    """Build the catalog index once per process"""
+    return NameResolver(load_catalog(path))
@@ -1,33 +1,86 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from shared_data import read_worksheet
+from baselines import baseline_columns, get_baseline_engine
 
-def get_prediction_score(row, weights, price_col, supply_col):
+PUMP_THRESHOLD = 80
+# Baseline each view scores against: the add-time snapshot, or a rolling horizon from price history
+VIEW_BASELINES = {
+    "Permanent": ("AT Price", "AT Supply"),
+    "Daily": baseline_columns("24h"),
+}
+
+def score_arrays(c_price, c_supply, e_price, e_supply, w_abs, w_div):
+    """Vectorised scoring formula; accepts scalars or broadcastable numpy arrays"""
+    c_price, c_supply = np.asarray(c_price, dtype=float), np.asarray(c_supply, dtype=float)
+    e_price, e_supply = np.asarray(e_price, dtype=float), np.asarray(e_supply, dtype=float)
+    valid = (e_supply != 0) & (e_price != 0) & ~np.isnan(e_price) & ~np.isnan(e_supply)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        supply_pct = (e_supply - c_supply) / e_supply
+        price_pct = (c_price - e_price) / e_price
+    abs_pts = np.clip(supply_pct * 1000, 0, 100)
+    # Divergence only counts when supply falls faster than price rises
+    div_pts = np.clip((supply_pct - price_pct) * 500, 0, 100)
+    return np.where(valid, (abs_pts * w_abs) + (div_pts * w_div), 0.0)
+
+def get_prediction_score(row, weights, price_col, supply_col, threshold=PUMP_THRESHOLD):
     # Ensure values are numeric to avoid crashes
     c_price, c_supply = float(row.get('Current Price', 0)), float(row.get('Supply', 0))
     e_price, e_supply = float(row.get(price_col, 0)), float(row.get(supply_col, 0))
-    
-    if e_supply == 0 or e_price == 0: return {'score': 0, 'signal': '⚖️ NEUTRAL'}
-    
-    supply_pct = (e_supply - c_supply) / e_supply
-    abs_pts = np.clip(supply_pct * 1000, 0, 100)
-    
-    price_pct = (c_price - e_price) / e_price
-    div_pts = np.clip((supply_pct - price_pct) * 500, 0, 100) if (supply_pct - price_pct) > 0 else 0
-    
-    total = round((abs_pts * weights['abs']) + (div_pts * weights['div']), 1)
-    return {'score': total, 'signal': "🥇 PUMP READY" if total >= 80 else "⚖️ NEUTRAL"}
+
+    # No baseline yet (e.g. item younger than the horizon) scores neutral
+    if e_supply == 0 or e_price == 0 or np.isnan(e_supply) or np.isnan(e_price):
+        return {'score': 0, 'signal': '⚖️ NEUTRAL'}
+
+    total = round(float(score_arrays(c_price, c_supply, e_price, e_supply, weights['abs'], weights['div'])), 1)
+    return {'score': total, 'signal': "🥇 PUMP READY" if total >= threshold else "⚖️ NEUTRAL"}
+
+def show_strategy_tuner():
+    # Imported here: backtest depends on this module's scoring formula
+    import backtest
+
+    st.caption("Weights and trigger level are measured against recorded price history")
+    c1, c2, c3 = st.columns(3)
+    st.session_state.w_abs = c1.slider("Supply Weight", 0.0, 1.0, float(st.session_state.get('w_abs', 0.4)), 0.05)
+    st.session_state.w_div = c2.slider("Divergence Weight", 0.0, 1.0, float(st.session_state.get('w_div', 0.3)), 0.05)
+    st.session_state.pump_threshold = c3.slider("PUMP READY at", 0, 100, int(st.session_state.get('pump_threshold', PUMP_THRESHOLD)), 5)
+
+    if st.button("📐 Run Backtest"):
+        with st.spinner("Replaying history..."):
+            # In-process: a process pool would fork the multi-threaded Streamlit server
+            report = backtest.run_backtest(backtest.load_history(), workers=1)
+        st.session_state.backtest_report = report
+
+    report = st.session_state.get('backtest_report')
+    if report is not None and not report.empty:
+        ranked = report[report['signals'] > 0].sort_values(['hit_rate', 'avg_fwd_return'], ascending=False)
+        st.dataframe(ranked.head(20), use_container_width=True)
+        if not ranked.empty and st.button("Apply Best Configuration"):
+            best = ranked.iloc[0]
+            st.session_state.w_abs, st.session_state.w_div = float(best['w_abs']), float(best['w_div'])
+            st.session_state.pump_threshold = int(best['threshold'])
+            st.rerun()
+    elif report is not None:
+        st.info("Not enough price history to backtest yet.")
 
 def show_predictor_view(conn, view_type="Permanent"):
     try:
-        items_df = conn.read(worksheet="Items", ttl=0)
+        items_df = read_worksheet(conn, "Items")
     except:
         st.info("No items found.")
         return
-        
+
     weights = {'abs': st.session_state.get('w_abs', 0.4), 'div': st.session_state.get('w_div', 0.3)}
-    p_col, s_col = ("AT Price", "AT Supply") if view_type == "Permanent" else ("Sess Price", "Sess Supply")
-    
+    threshold = st.session_state.get('pump_threshold', PUMP_THRESHOLD)
+    p_col, s_col = VIEW_BASELINES.get(view_type, VIEW_BASELINES["Permanent"])
+
     if not items_df.empty:
-        results = [get_prediction_score(row, weights, p_col, s_col) for _, row in items_df.iterrows()]
-        # Display logic continues here...
\ No newline at end of file
+        # One as-of join against price history gives every item its 1h/24h/7d/30d baselines
+        items_df = get_baseline_engine().attach(items_df)
+        results = [get_prediction_score(row, weights, p_col, s_col, threshold) for _, row in items_df.iterrows()]
+        items_df['Score'] = [r['score'] for r in results]
+        items_df['Signal'] = [r['signal'] for r in results]
+        st.caption(f"Scored against {p_col} / {s_col}")
+        shown = [c for c in ['Item Name', 'Current Price', 'Supply', p_col, s_col, 'Score', 'Signal'] if c in items_df]
+        st.dataframe(items_df[shown].sort_values('Score', ascending=False), use_container_width=True, hide_index=True)
@@ -0,0 +1,306 @@
+import time
+import threading
+import pandas as pd
+import streamlit as st
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
+from typing_extensions import TypedDict
+from pydantic import BaseModel
+
+ALERTS_WORKSHEET = "Alerts"
+ALERT_COLUMNS = ["Member", "Item Name", "Kind", "Threshold", "Window (min)", "Cooldown (min)"]
+# Fired alerts kept per member until their next page view (and for the recent list)
+INBOX_SIZE = 200
+
+RuleKind = Literal["price_above", "price_below", "pct_change", "supply_drop"]
+
+class AlertRule(BaseModel):
+    """
+    A single member alert
+
+    price_above/price_below: threshold is a price in CNY
+    pct_change: threshold is a % move over `window_minutes` (negative = drop)
+    supply_drop: threshold is the % fall in listings over `window_minutes`
+    """
+    member: str
+    item: str
+    kind: RuleKind
+    threshold: float
+    window_minutes: int = 0
+    cooldown_minutes: int = 60
+
+    @property
+    def key(self) -> Tuple:
+        return (self.member, self.item, self.kind, self.threshold, self.window_minutes)
+
+class Alert(TypedDict):
+    member: str
+    item: str
+    kind: str
+    threshold: float
+    value: float
+    time: str
+
+class _Ladder:
+    """Sorted thresholds with the rule keys that own them, kept in lockstep"""
+    __slots__ = ("thresholds", "keys")
+
+    def __init__(self):
+        self.thresholds: List[float] = []
+        self.keys: List[Tuple] = []
+
+    def add(self, threshold: float, key: Tuple):
+        pos = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(pos, threshold)
+        self.keys.insert(pos, key)
+
+    def remove(self, threshold: float, key: Tuple):
+        lo = bisect_left(self.thresholds, threshold)
+        hi = bisect_right(self.thresholds, threshold)
+        for pos in range(lo, hi):
+            if self.keys[pos] == key:
+                del self.thresholds[pos], self.keys[pos]
+                return
+
+    def up_to(self, value: float) -> List[Tuple]:
+        """Rules whose threshold is <= value"""
+        return self.keys[:bisect_right(self.thresholds, value)]
+
+    def between(self, low: float, high: float) -> List[Tuple]:
+        """Rules whose threshold lies in (low, high]"""
+        return self.keys[bisect_right(self.thresholds, low):bisect_right(self.thresholds, high)]
+
+    def __len__(self):
+        return len(self.thresholds)
+
+class _ItemBook:
+    """All rules and recent samples for one market hash name"""
+
+    def __init__(self):
+        self.above = _Ladder()
+        self.below = _Ladder()
+        # Per-window ladders: rises and drops (as positive magnitudes) kept apart
+        self.rises: Dict[int, _Ladder] = {}
+        self.drops: Dict[int, _Ladder] = {}
+        self.supply_drops: Dict[int, _Ladder] = {}
+        self.samples: deque = deque()  # (ts, price, supply)
+
+    def max_window(self) -> int:
+        windows = list(self.rises) + list(self.drops) + list(self.supply_drops)
+        return max(windows, default=0)
+
+    def baseline(self, now: float, window_minutes: int) -> Optional[Tuple[float, float, float]]:
+        """Latest sample at or before `now - window`, else the oldest one we kept"""
+        cutoff = now - window_minutes * 60
+        chosen = None
+        for sample in self.samples:
+            if sample[0] > cutoff: break
+            chosen = sample
+        return chosen or (self.samples[0] if self.samples else None)
+
+class AlertEngine:
+    """
+    Evaluates price updates against member alert rules
+
+    Rules are bucketed per item into sorted threshold ladders, so an update
+    only touches the slice of rules its new value can actually trigger
+    (a bisect plus the matching keys) rather than scanning every rule.
+    Fired alerts go to the owning member's inbox, whoever's refresh
+    triggered them.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.rules: Dict[Tuple, AlertRule] = {}
+        self.books: Dict[str, _ItemBook] = {}
+        self.last_fired: Dict[Tuple, float] = {}
+        self.last_price: Dict[str, float] = {}
+        self.inbox: Dict[str, deque] = {}
+        self.recent: Dict[str, deque] = {}
+
+    def __len__(self):
+        return len(self.rules)
+
+    def add_rule(self, rule: AlertRule) -> bool:
+        """Register a rule; identical rules from the same member are ignored"""
+        with self.lock:
+            if rule.key in self.rules: return False
+            self.rules[rule.key] = rule
+            book = self.books.setdefault(rule.item, _ItemBook())
+            for ladder, threshold in self._ladders(book, rule, create=True):
+                ladder.add(threshold, rule.key)
+            return True
+
+    def remove_rule(self, rule: AlertRule) -> bool:
+        with self.lock:
+            if self.rules.pop(rule.key, None) is None: return False
+            book = self.books[rule.item]
+            for ladder, threshold in self._ladders(book, rule, create=False):
+                ladder.remove(threshold, rule.key)
+            self.last_fired.pop(rule.key, None)
+            return True
+
+    def rules_for(self, member: str) -> List[AlertRule]:
+        with self.lock:
+            return [r for r in self.rules.values() if r.member == member]
+
+    def drain(self, member: str) -> List[Alert]:
+        """Alerts fired for `member` since the last drain"""
+        with self.lock:
+            queue = self.inbox.get(member)
+            if not queue: return []
+            alerts = list(queue)
+            queue.clear()
+            return alerts
+
+    def recent_alerts(self, member: str) -> List[Alert]:
+        with self.lock:
+            return list(reversed(self.recent.get(member, ())))
+
+    def _ladders(self, book: _ItemBook, rule: AlertRule, create: bool):
+        if rule.kind == "price_above": return [(book.above, rule.threshold)]
+        if rule.kind == "price_below": return [(book.below, -rule.threshold)]
+        if rule.kind == "pct_change":
+            table = book.rises if rule.threshold >= 0 else book.drops
+        else:
+            table = book.supply_drops
+        if rule.window_minutes not in table:
+            if not create: return []
+            table[rule.window_minutes] = _Ladder()
+        return [(table[rule.window_minutes], abs(rule.threshold))]
+
+    def evaluate(self, updates: Iterable[Tuple[str, float, float]], now: Optional[float] = None) -> List[Alert]:
+        """
+        Check a refresh cycle worth of (item, price, supply) updates
+
+        Items without rules are skipped after a dict lookup. Within a cycle
+        each (member, item, kind) fires at most once, and a rule that fired
+        stays quiet for its cooldown.
+
+        Returns:
+            Alerts that fired this cycle (also queued in each member's inbox)
+        """
+        with self.lock:
+            return self._evaluate(updates, now)
+
+    def _evaluate(self, updates: Iterable[Tuple[str, float, float]], now: Optional[float]) -> List[Alert]:
+        now = time.time() if now is None else now
+        # Only the latest update per item matters for one cycle
+        latest = {}
+        for item, price, supply in updates:
+            latest[item] = (float(price), float(supply))
+
+        fired: Dict[Tuple, Tuple[AlertRule, float]] = {}
+        for item, (price, supply) in latest.items():
+            book = self.books.get(item)
+            prev = self.last_price.get(item)
+            self.last_price[item] = price
+            if book is None: continue
+
+            hits: List[Tuple[Tuple, float]] = []
+            # Level rules are edge-triggered: only thresholds crossed since the last price
+            if prev is None:
+                hits += [(k, price) for k in book.above.up_to(price)]
+                hits += [(k, price) for k in book.below.up_to(-price)]
+            elif price > prev:
+                hits += [(k, price) for k in book.above.between(prev, price)]
+            elif price < prev:
+                hits += [(k, price) for k in book.below.between(-prev, -price)]
+
+            self._record(book, now, price, supply)
+            for window, ladder in book.rises.items():
+                change = self._pct_change(book, now, window, price, 1)
+                if change > 0: hits += [(k, change) for k in ladder.up_to(change)]
+            for window, ladder in book.drops.items():
+                change = self._pct_change(book, now, window, price, 1)
+                if change < 0: hits += [(k, change) for k in ladder.up_to(-change)]
+            for window, ladder in book.supply_drops.items():
+                change = self._pct_change(book, now, window, supply, 2)
+                if change < 0: hits += [(k, -change) for k in ladder.up_to(-change)]
+
+            for key, value in hits:
+                rule = self.rules[key]
+                if now - self.last_fired.get(key, float("-inf")) < rule.cooldown_minutes * 60: continue
+                dedup = (rule.member, rule.item, rule.kind)
+                # Keep the most extreme threshold when a member crosses several at once
+                if dedup not in fired or _extremity(rule) > _extremity(fired[dedup][0]):
+                    fired[dedup] = (rule, value)
+
+        stamp = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M")
+        alerts = []
+        for rule, value in fired.values():
+            self.last_fired[rule.key] = now
+            alert = Alert(member=rule.member, item=rule.item, kind=rule.kind,
+                          threshold=rule.threshold, value=round(value, 2), time=stamp)
+            self.inbox.setdefault(rule.member, deque(maxlen=INBOX_SIZE)).append(alert)
+            self.recent.setdefault(rule.member, deque(maxlen=INBOX_SIZE)).append(alert)
+            alerts.append(alert)
+        return alerts
+
+    def _record(self, book: _ItemBook, now: float, price: float, supply: float):
+        book.samples.append((now, price, supply))
+        # Keep one sample older than the widest window so it can serve as baseline
+        cutoff = now - book.max_window() * 60
+        while len(book.samples) > 2 and book.samples[1][0] <= cutoff:
+            book.samples.popleft()
+
+    def _pct_change(self, book: _ItemBook, now: float, window: int, value: float, field: int) -> float:
+        base = book.baseline(now, window)
+        if not base or not base[field]: return 0.0
+        return (value - base[field]) / base[field] * 100
+
+def _extremity(rule: AlertRule) -> float:
+    """How far out a rule's threshold sits: the lowest floor is the most extreme price_below"""
+    if rule.kind == "price_above": return rule.threshold
+    if rule.kind == "price_below": return -rule.threshold
+    return abs(rule.threshold)
+
+def format_alert(alert: Alert) -> str:
+    labels = {
+        "price_above": "rose above ¥{threshold}",
+        "price_below": "fell below ¥{threshold}",
+        "pct_change": "moved {value}% (rule {threshold}%)",
+        "supply_drop": "listings dropped {value}% (rule {threshold}%)",
+    }
+    return f"🔔 {alert['item']} " + labels[alert["kind"]].format(**alert)
+
+def _int_or(value, default: int) -> int:
+    """Sheet cell as int; blank/NaN cells fall back to `default` but a real 0 stays 0"""
+    if value is None or value == "" or pd.isna(value): return default
+    return int(value)
+
+def rules_from_frame(df: pd.DataFrame) -> List[AlertRule]:
+    """Build rules from the Alerts worksheet, skipping malformed rows"""
+    rules = []
+    for row in df.to_dict("records"):
+        try:
+            rules.append(AlertRule(member=str(row["Member"]), item=str(row["Item Name"]),
+                                   kind=row["Kind"], threshold=float(row["Threshold"]),
+                                   window_minutes=_int_or(row.get("Window (min)"), 0),
+                                   cooldown_minutes=_int_or(row.get("Cooldown (min)"), 60)))
+        except Exception as e:
+            print(f"Skipping alert rule {row}: {e}")
+    return rules
+
+def rules_to_frame(rules: Iterable[AlertRule]) -> pd.DataFrame:
+    return pd.DataFrame([[r.member, r.item, r.kind, r.threshold, r.window_minutes, r.cooldown_minutes]
+                         for r in rules], columns=ALERT_COLUMNS)
+
+def load_rules(conn) -> List[AlertRule]:
+    try:
+        return rules_from_frame(conn.read(worksheet=ALERTS_WORKSHEET, ttl=0))
+    except Exception:
+        conn.create(worksheet=ALERTS_WORKSHEET, data=pd.DataFrame(columns=ALERT_COLUMNS))
+        return []
+
+def save_rules(conn, engine: AlertEngine):
+    with engine.lock:
+        rules = list(engine.rules.values())
+    conn.update(worksheet=ALERTS_WORKSHEET, data=rules_to_frame(rules))
+
+@st.cache_resource
+def get_alert_engine() -> AlertEngine:
+    """One engine per process: every price refresh path evaluates into it"""
+    return AlertEngine()
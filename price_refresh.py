@@ -0,0 +1,149 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from steamdt_api import SteamdtAPI, SteamdtAPIException
+from sheets_config import update_sheet
+from valuation import get_valuation
+from shared_data import invalidate
+from live_prices import get_price_store
+from price_alerts import get_alert_engine
+from baselines import get_baseline_engine
+
+# The batch endpoint accepts at most 100 market hash names per request
+BATCH_SIZE = 100
+MAX_RETRY_ROUNDS = 3
+PREFERRED_PLATFORM = "BUFF"
+
+def chunked(names: List[str], size: int = BATCH_SIZE) -> Iterator[List[str]]:
+    """Yield consecutive slices of at most `size` names"""
+    for start in range(0, len(names), size):
+        yield names[start:start + size]
+
+def _batch_quotes(api: SteamdtAPI, names: List[str]) -> Dict[str, Tuple[float, int, bool]]:
+    """Price one chunk, mapping each returned name to (price, supply, cached); {} if the request failed"""
+    try:
+        columns = api.get_batch_prices(names)
+    except SteamdtAPIException as e:
+        print(f"Batch of {len(names)} failed: {e}")
+        return {}
+    got_names, price, supply = columns.quotes(PREFERRED_PLATFORM)
+    ok = ~np.isnan(price)
+    return {n: (p, s, columns.cached) for n, p, s, keep in zip(got_names, price.tolist(), supply.tolist(), ok) if keep}
+
+def fetch_quotes(api: SteamdtAPI, names: List[str], batch_size: int = BATCH_SIZE,
+                 max_rounds: int = MAX_RETRY_ROUNDS) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Fetch prices for many items through the batch endpoint
+
+    Each round sends only the names that are still missing, so a failed
+    chunk or a partial response never re-requests items we already have.
+
+    Args:
+        api: Steamdt API client
+        names: Market hash names to price (duplicates are ignored)
+        batch_size: Names per batch request
+        max_rounds: Attempts per name before giving up
+
+    Returns:
+        (quotes frame indexed by name with price/supply/cached, names that never resolved);
+        `cached` rows are last good values replayed while Steamdt is unavailable
+    """
+    pending = list(dict.fromkeys(n for n in names if n))
+    quotes: Dict[str, Tuple[float, int, bool]] = {}
+
+    for attempt in range(max_rounds):
+        failed = []
+        for chunk in chunked(pending, batch_size):
+            got = _batch_quotes(api, chunk)
+            quotes.update(got)
+            failed.extend(n for n in chunk if n not in got)
+        pending = failed
+        if not pending: break
+        if attempt < max_rounds - 1: time.sleep(2 ** attempt)
+
+    frame = pd.DataFrame.from_dict(quotes, orient="index", columns=["price", "supply", "cached"])
+    frame["cached"] = frame["cached"].astype(bool)
+    # Every fetch feeds the live panels and alerts; only the refresh paths below
+    # append to the price history, so the feeder and crawler stay out of history.csv.
+    # Cached replays are not new observations and feed none of them.
+    fresh = fresh_quotes(frame)
+    get_price_store().publish(fresh)
+    get_alert_engine().evaluate(zip(fresh.index, fresh["price"], fresh["supply"]))
+    return frame, pending
+
+def fresh_quotes(quotes: pd.DataFrame) -> pd.DataFrame:
+    """Quotes actually fetched this time, without cached replays"""
+    return quotes[~quotes["cached"]] if "cached" in quotes else quotes
+
+def merge_quotes(df: pd.DataFrame, quotes: pd.DataFrame, price_col: str = "Price (CNY)",
+                 supply_col: str = "Supply", name_col: str = "Item Name") -> pd.DataFrame:
+    """
+    Write fetched quotes into the matching rows of `df` in one vectorised pass
+
+    Cached replays are skipped: those rows keep their last price and the
+    Last Updated time it was really fetched at.
+    """
+    df = df.copy()
+    quotes = fresh_quotes(quotes)
+    names = df[name_col]
+    hit = names.isin(quotes.index)
+    if hit.any():
+        # pandas 3 refuses to upcast on .loc assignment: whole-number prices read back as
+        # int64 and an empty Last Updated column as float64, so widen them first
+        if price_col in df.columns: df[price_col] = pd.to_numeric(df[price_col], errors="coerce").astype(float)
+        if supply_col in df.columns: df[supply_col] = pd.to_numeric(df[supply_col], errors="coerce")
+        if "Last Updated" in df.columns: df["Last Updated"] = df["Last Updated"].astype(object)
+        df.loc[hit, price_col] = names[hit].map(quotes["price"]).values
+        df.loc[hit, supply_col] = names[hit].map(quotes["supply"]).values
+        df.loc[hit, "Last Updated"] = datetime.now().strftime("%Y-%m-%d %H:%M")
+    return df
+
+def refresh_frame(df: pd.DataFrame, api: SteamdtAPI, price_col: str = "Price (CNY)",
+                  name_col: str = "Item Name") -> Tuple[pd.DataFrame, List[str], List[str]]:
+    """Refresh every row of a portfolio/Items frame and record it, returning (new frame, failed names, cached names)"""
+    if df.empty: return df, [], []
+    quotes, failed = fetch_quotes(api, df[name_col].astype(str).tolist())
+    get_baseline_engine().record(fresh_quotes(quotes))
+    cached = quotes.index[quotes["cached"]].tolist()
+    return merge_quotes(df, quotes, price_col=price_col, name_col=name_col), failed, cached
+
+def refresh_portfolio(api: SteamdtAPI, csv_file: str = "portfolio.csv",
+                      sheet: Optional[Tuple[str, str]] = None) -> Tuple[pd.DataFrame, List[str], List[str]]:
+    """
+    Refresh the whole portfolio with one CSV write and at most one Sheets write
+
+    Args:
+        api: Steamdt API client
+        csv_file: Local portfolio file
+        sheet: Optional (spreadsheet, worksheet) to mirror the result to
+
+    Returns:
+        (refreshed portfolio, names that could not be priced, names left at their
+        cached price because Steamdt was unavailable)
+    """
+    if not os.path.exists(csv_file): return pd.DataFrame(), [], []
+    df = pd.read_csv(csv_file)
+    if df.empty: return df, [], []
+    quotes, failed = fetch_quotes(api, df["Item Name"].astype(str).tolist())
+    fresh = fresh_quotes(quotes)
+    get_baseline_engine().record(fresh)
+    # Merge into a fresh read so rows other sessions added during the fetch survive,
+    # and feed the same prices to the shared valuation
+    with get_valuation(csv_file).writing() as valuation:
+        df = merge_quotes(pd.read_csv(csv_file), quotes)
+        valuation.apply_ticks(zip(fresh.index, fresh["price"]))
+        df.to_csv(csv_file, index=False)
+    if sheet: update_sheet(sheet[0], sheet[1], df)
+    return df, failed, quotes.index[quotes["cached"]].tolist()
+
+def refresh_items_sheet(conn, api: SteamdtAPI) -> Tuple[pd.DataFrame, List[str], List[str]]:
+    """Refresh the Items worksheet and write it back once, returning (frame, failed names, cached names)"""
+    items_df = conn.read(worksheet="Items", ttl=0)
+    items_df, failed, cached = refresh_frame(items_df, api, price_col="Current Price")
+    if not items_df.empty:
+        conn.update(worksheet="Items", data=items_df)
+        invalidate("Items")
+    return items_df, failed, cached
@@ -0,0 +1,139 @@
+import os
+import sys
+import json
+import time
+import glob
+import threading
+import functools
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+PROFILE_DIR = os.getenv("JDL_PROFILE_DIR", "profiles")
+SAMPLE_INTERVAL = float(os.getenv("JDL_PROFILE_INTERVAL", "0.005"))  # seconds
+KEEP_SLOWEST = int(os.getenv("JDL_PROFILE_KEEP", "20"))
+
+# Process-wide switch so an admin can turn profiling on for every session
+_state = {"enabled": os.getenv("JDL_PROFILE", "") not in ("", "0")}
+
+def is_enabled() -> bool:
+    return _state["enabled"]
+
+def set_enabled(enabled: bool):
+    _state["enabled"] = bool(enabled)
+
+class _Sampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval"""
+
+    def __init__(self, target_ident: int, interval: float):
+        super().__init__(daemon=True, name="rerun-profiler")
+        self.target_ident = target_ident
+        self.interval = interval
+        # Stack -> seconds attributed to it
+        self.stacks: Dict[Tuple, float] = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        last = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            # Weight by real elapsed time: the GIL can stretch the interval
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            frame = sys._current_frames().get(self.target_ident)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                key = tuple(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0.0) + elapsed
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+def _speedscope(label: str, stacks: Dict[Tuple, float], duration: float) -> dict:
+    """Build a speedscope 'sampled' profile from aggregated stacks"""
+    frames: List[dict] = []
+    index: Dict[Tuple, int] = {}
+    samples, weights = [], []
+    for stack, seconds in stacks.items():
+        ids = []
+        for key in stack:
+            if key not in index:
+                index[key] = len(frames)
+                frames.append({"name": key[0], "file": key[1], "line": key[2]})
+            ids.append(index[key])
+        samples.append(ids)
+        weights.append(round(seconds * 1000, 3))
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": label,
+        "exporter": "jdl-web-terminal",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": label,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": round(duration * 1000, 3),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+
+def _rotate(keep: Optional[int] = None):
+    """Keep only the `keep` slowest reports (duration leads the file name)"""
+    keep = KEEP_SLOWEST if keep is None else keep
+    reports = sorted(glob.glob(os.path.join(PROFILE_DIR, "rerun_*.speedscope.json")), reverse=True)
+    for path in reports[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+@contextmanager
+def profile_rerun(label: str, force: bool = False):
+    """
+    Sample the current Streamlit rerun and save a speedscope report
+
+    Does nothing unless profiling is enabled (JDL_PROFILE=1 or the admin
+    toggle). Reports land in PROFILE_DIR, open them at speedscope.app.
+    """
+    if not (force or is_enabled()):
+        yield None
+        return
+
+    sampler = _Sampler(threading.get_ident(), SAMPLE_INTERVAL)
+    start = time.perf_counter()
+    sampler.start()
+    try:
+        yield sampler
+    finally:
+        sampler.stop()
+        duration = time.perf_counter() - start
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            path = os.path.join(PROFILE_DIR, f"rerun_{int(duration * 1000):08d}ms_{stamp}_{label}.speedscope.json")
+            with open(path, "w") as f:
+                json.dump(_speedscope(label, sampler.stacks, duration), f)
+            _rotate()
+        except Exception as e:
+            print(f"Profiler Error: {e}")
+
+def profiled(label: Optional[str] = None):
+    """Decorator form of profile_rerun for view entry points"""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with profile_rerun(label or fn.__name__):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def list_reports() -> List[Tuple[str, float]]:
+    """(path, duration ms) of saved reports, slowest first"""
+    reports = sorted(glob.glob(os.path.join(PROFILE_DIR, "rerun_*.speedscope.json")), reverse=True)
+    return [(p, float(os.path.basename(p).split("_")[1].rstrip("ms"))) for p in reports]
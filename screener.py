@@ -0,0 +1,120 @@
+import os
+import glob
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Dict, List, Optional, Sequence
+from predictor import PUMP_THRESHOLD, score_arrays
+from snapshot_crawler import SNAPSHOT_DIR
+from name_facets import FacetIndex
+
+RESULT_COLUMNS = ["Item Name", "Category", "Weapon", "Price (CNY)", "Supply", "Score", "Signal"]
+
+def list_snapshots(out_dir: str = SNAPSHOT_DIR) -> List[str]:
+    return sorted(glob.glob(os.path.join(out_dir, "snapshot_*.parquet")))
+
+class MarketFeatures:
+    """
+    Precomputed per-item arrays for one snapshot against a baseline snapshot
+
+    Built once per snapshot pair; screening is then pure array work.
+    """
+
+    def __init__(self, current: pd.DataFrame, baseline: Optional[pd.DataFrame]):
+        current = current.dropna(subset=["Price (CNY)"]).drop_duplicates("Item Name")
+        self.names = current["Item Name"].to_numpy()
+        self.price = current["Price (CNY)"].to_numpy(dtype=float)
+        self.supply = current["Supply"].to_numpy(dtype=float, na_value=0)
+        if baseline is not None:
+            base = baseline.drop_duplicates("Item Name").set_index("Item Name")
+            self.base_price = current["Item Name"].map(base["Price (CNY)"]).to_numpy(dtype=float, na_value=0)
+            self.base_supply = current["Item Name"].map(base["Supply"]).to_numpy(dtype=float, na_value=0)
+        else:
+            self.base_price = np.zeros_like(self.price)
+            self.base_supply = np.zeros_like(self.supply)
+        # Rows of the facet index line up with the feature arrays
+        self.facets = FacetIndex(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def screen(self, weights: Dict[str, float], k: int = 50, min_price: float = 0.0,
+               max_price: float = np.inf, min_supply: float = 0, categories: Sequence[str] = (),
+               weapons: Sequence[str] = (), threshold: float = PUMP_THRESHOLD, only_signals: bool = False) -> pd.DataFrame:
+        """
+        Top-k items by predictor score after filters
+
+        Only the filtered rows are scored, and the top-k are picked with a
+        partial sort (argpartition) before ordering those k.
+        """
+        mask = (self.price >= min_price) & (self.price <= max_price) & (self.supply >= min_supply)
+        if categories or weapons:
+            mask &= self.facets.mask(category=list(categories), weapon=list(weapons))
+        idx = np.flatnonzero(mask)
+        if idx.size == 0: return pd.DataFrame(columns=RESULT_COLUMNS)
+
+        scores = score_arrays(self.price[idx], self.supply[idx], self.base_price[idx], self.base_supply[idx],
+                              weights['abs'], weights['div'])
+        if only_signals:
+            keep = scores >= threshold
+            idx, scores = idx[keep], scores[keep]
+        k = min(k, idx.size)
+        if k == 0: return pd.DataFrame(columns=RESULT_COLUMNS)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        rows, top_scores = idx[top], scores[top]
+        return pd.DataFrame({
+            "Item Name": self.names[rows],
+            "Category": [self.facets.values["category"][c] for c in self.facets.codes["category"][rows]],
+            "Weapon": [self.facets.values["weapon"][c] for c in self.facets.codes["weapon"][rows]],
+            "Price (CNY)": self.price[rows],
+            "Supply": self.supply[rows].astype(int),
+            "Score": top_scores.round(1),
+            "Signal": np.where(top_scores >= threshold, "🥇 PUMP READY", "⚖️ NEUTRAL"),
+        })
+
+def load_features(snapshot_path: str, baseline_path: Optional[str] = None) -> MarketFeatures:
+    columns = ["Item Name", "Price (CNY)", "Supply"]
+    current = pd.read_parquet(snapshot_path, columns=columns)
+    baseline = pd.read_parquet(baseline_path, columns=columns) if baseline_path else None
+    return MarketFeatures(current, baseline)
+
+@st.cache_resource(max_entries=4)
+def get_features(snapshot_path: str, baseline_path: Optional[str], mtime: float) -> MarketFeatures:
+    """Features are shared by every session; `mtime` rebuilds them when a snapshot is rewritten"""
+    return load_features(snapshot_path, baseline_path)
+
+def show_screener_view():
+    st.header("🔭 Market Screener")
+    snapshots = list_snapshots()
+    if not snapshots:
+        st.info("No market snapshot yet. Run `python snapshot_crawler.py` to create one.")
+        return
+
+    labels = [os.path.basename(p)[len("snapshot_"):-len(".parquet")] for p in snapshots]
+    c1, c2 = st.columns(2)
+    current = c1.selectbox("Snapshot", labels, index=len(labels) - 1)
+    earlier = ["(none)"] + [l for l in labels if l < current]
+    baseline = c2.selectbox("Compare Against", earlier, index=len(earlier) - 1)
+
+    current_path = snapshots[labels.index(current)]
+    baseline_path = snapshots[labels.index(baseline)] if baseline != "(none)" else None
+    features = get_features(current_path, baseline_path, os.path.getmtime(current_path))
+
+    f1, f2, f3, f4 = st.columns(4)
+    min_price = f1.number_input("Min Price (¥)", min_value=0.0, value=1.0)
+    max_price = f2.number_input("Max Price (¥)", min_value=0.0, value=10000.0)
+    min_supply = f3.number_input("Min Supply", min_value=0, value=50, step=10)
+    k = f4.number_input("Top", min_value=10, max_value=500, value=50, step=10)
+    g1, g2 = st.columns(2)
+    categories = g1.multiselect("Category", features.facets.options("category"))
+    in_scope = features.facets.select(category=categories)
+    weapons = g2.multiselect("Weapon", [w for w in features.facets.options("weapon", in_scope) if w])
+    only_signals = st.checkbox("🥇 PUMP READY only")
+
+    weights = {'abs': st.session_state.get('w_abs', 0.4), 'div': st.session_state.get('w_div', 0.3)}
+    threshold = st.session_state.get('pump_threshold', PUMP_THRESHOLD)
+    results = features.screen(weights, int(k), min_price, max_price, min_supply,
+                              categories, weapons, threshold, only_signals)
+    st.caption(f"{len(features):,} items in snapshot · showing top {len(results)}")
+    st.dataframe(results, use_container_width=True, hide_index=True)
@@ -0,0 +1,132 @@
+import time
+import threading
+import pandas as pd
+import streamlit as st
+from typing import Callable, Dict, Optional, Tuple
+
+# Copy-on-write makes shallow copies safe to hand out: a session that edits
+# its frame copies only the columns it touches, never the shared buffers.
+# It is always on from pandas 3, where the option is deprecated.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# How long a shared frame is served before the next reader reloads it
+MAX_AGE_SECONDS = 30
+# Sessions seen within this window count as active in the memory report
+SESSION_WINDOW_SECONDS = 600
+
+class SharedFrames:
+    """Process-wide, versioned frames that every session reads from"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frames: Dict[Tuple, Tuple[int, float, pd.DataFrame]] = {}
+        self.versions: Dict[Tuple, int] = {}
+        self.sessions: Dict[str, float] = {}
+
+    def get(self, key: Tuple, loader: Callable[[], pd.DataFrame], clean: bool, max_age: float) -> pd.DataFrame:
+        with self.lock:
+            entry = self.frames.get(key + (clean,))
+        if entry is None or time.time() - entry[1] > max_age:
+            df = loader()
+            if clean: df = df.fillna("")
+            with self.lock:
+                version = self.versions[key] = self.versions.get(key, 0) + 1
+                entry = self.frames[key + (clean,)] = (version, time.time(), df)
+        return entry[2]
+
+    def invalidate(self, worksheet: str):
+        with self.lock:
+            for full_key in [k for k in self.frames if worksheet in k[:-1]]:
+                del self.frames[full_key]
+
+    def touch(self, session_id: Optional[str]):
+        if session_id:
+            self.sessions[session_id] = time.time()
+
+    def active_sessions(self) -> int:
+        cutoff = time.time() - SESSION_WINDOW_SECONDS
+        return sum(1 for seen in list(self.sessions.values()) if seen >= cutoff)
+
+@st.cache_resource
+def _store() -> SharedFrames:
+    return SharedFrames()
+
+def _session_id() -> Optional[str]:
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
+def shared_frame(key: Tuple, loader: Callable[[], pd.DataFrame], clean: bool = False,
+                 max_age: float = MAX_AGE_SECONDS) -> pd.DataFrame:
+    """
+    Zero-copy view of a frame shared by every session
+
+    Args:
+        key: Identity of the data, e.g. ("conn", "Sheet1")
+        loader: Called to (re)load the frame when missing or stale
+        clean: Share the fillna("") version instead of re-cleaning per session
+        max_age: Seconds before the shared frame is reloaded
+
+    Returns:
+        A shallow copy; edits copy-on-write and never reach other sessions
+    """
+    store = _store()
+    store.touch(_session_id())
+    return store.get(key, loader, clean, max_age).copy(deep=False)
+
+def read_worksheet(conn, worksheet: str, clean: bool = False) -> pd.DataFrame:
+    """Shared equivalent of conn.read(worksheet=..., ttl=0)"""
+    return shared_frame(("conn", worksheet), lambda: conn.read(worksheet=worksheet, ttl=0), clean)
+
+def read_sheet_shared(sheet_name: str, worksheet: str, clean: bool = False) -> pd.DataFrame:
+    """Shared equivalent of sheets_config.read_sheet"""
+    from sheets_config import read_sheet
+    return shared_frame(("sheets", sheet_name, worksheet), lambda: read_sheet(sheet_name, worksheet), clean)
+
+def invalidate(worksheet: str):
+    """Drop shared copies of a worksheet after this process wrote to it"""
+    _store().invalidate(worksheet)
+
+def memory_report() -> pd.DataFrame:
+    """
+    Bytes held for shared frames vs. an estimate of per-session copies
+
+    The estimate assumes every active session would hold its own full copy
+    of each frame (size x sessions); it is not measured.
+    """
+    store = _store()
+    sessions = max(store.active_sessions(), 1)
+    rows = []
+    with store.lock:
+        entries = list(store.frames.items())
+    for full_key, (version, loaded_at, df) in entries:
+        size = int(df.memory_usage(deep=True).sum())
+        rows.append({
+            "Frame": " / ".join(map(str, full_key[:-1])) + (" (clean)" if full_key[-1] else ""),
+            "Version": version,
+            "Rows": len(df),
+            "Shared Bytes": size,
+            "Est. Before (size × sessions)": size * sessions,
+            "After / Session": size // sessions,
+        })
+    return pd.DataFrame(rows)
+
+def show_memory_report():
+    with st.expander("🧠 Shared Data Memory"):
+        report = memory_report()
+        sessions = _store().active_sessions()
+        if report.empty:
+            st.caption("No shared frames loaded yet.")
+            return
+        before, after = report["Est. Before (size × sessions)"].sum(), report["Shared Bytes"].sum()
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Active Sessions", sessions)
+        c2.metric("Est. Before", f"{before / 1e6:.2f} MB",
+                  help="Estimate: every active session holding its own full copy of each frame (not measured)")
+        c3.metric("After", f"{after / 1e6:.2f} MB", f"-{(1 - after / before) * 100:.0f}%" if before else None,
+                  delta_color="inverse")
+        st.dataframe(report, use_container_width=True, hide_index=True)
@@ -1,12 +1,24 @@
 import os
+import re
+import json
 import time
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import pandas as pd
 from datetime import datetime
 import streamlit as st
-from functools import lru_cache
 import random
+import tempfile
+from shared_data import invalidate as invalidate_shared
+
+# Local read-through mirror of worksheets, one Parquet file + revision sidecar each
+MIRROR_DIR = os.getenv("SHEETS_MIRROR_DIR", ".sheets_mirror")
+# How long a mirror is trusted before asking Drive whether the spreadsheet changed
+REVALIDATE_SECONDS = 30
+
+_client = None
+_spreadsheets = {}
+_memory = {}
 
 def init_google_sheets():
     """Initialize Google Sheets connection"""
@@ -14,27 +26,112 @@ def init_google_sheets():
     try:
         if not os.path.exists('google_sheets_credentials.json'):
             raise FileNotFoundError("Missing 'google_sheets_credentials.json'")
-        
+
         creds = ServiceAccountCredentials.from_json_keyfile_name('google_sheets_credentials.json', scope)
         return gspread.authorize(creds)
     except Exception as e:
         raise Exception(f"Setup Required: {str(e)}")
 
-@lru_cache(maxsize=5)
-def _cached_read_sheet(sheet_name, worksheet_name, cache_key):
-    """Cached version of sheet reading to minimize API calls"""
-    client = init_google_sheets()
-    sheet = client.open(sheet_name)
-    worksheet = sheet.worksheet(worksheet_name)
-    return pd.DataFrame(worksheet.get_all_records())
+def _open_spreadsheet(sheet_name):
+    """Authorize and open a spreadsheet once per process"""
+    global _client
+    if _client is None: _client = init_google_sheets()
+    if sheet_name not in _spreadsheets:
+        _spreadsheets[sheet_name] = _client.open(sheet_name)
+    return _spreadsheets[sheet_name]
 
-def read_sheet_safe(sheet_name, worksheet_name):
-    """Read data with exponential backoff for rate limit protection"""
+def open_worksheet(sheet_name, worksheet_name):
+    """Worksheet handle on the shared per-process client"""
+    return _open_spreadsheet(sheet_name).worksheet(worksheet_name)
+
+def _revision(spreadsheet):
+    """Drive modifiedTime of the spreadsheet (a single metadata request)"""
+    getter = getattr(spreadsheet, "get_lastUpdateTime", None)
+    return getter() if getter else spreadsheet.lastUpdateTime
+
+def _mirror_path(sheet_name, worksheet_name):
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "_", f"{sheet_name}__{worksheet_name}")
+    return os.path.join(MIRROR_DIR, slug)
+
+def _load_meta(path):
+    try:
+        with open(path + ".json", "r") as f: return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _replace_atomically(target, write):
+    """
+    Run write(tmp_path) on a temp file unique to this call, then move it over `target`
+
+    Sessions and processes revalidate concurrently, so a shared temp name
+    could be truncated or moved away by another writer mid-write.
+    """
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(target) or ".", prefix=os.path.basename(target) + ".",
+                                     suffix=".tmp", delete=False) as f:
+        tmp = f.name
+    try:
+        write(tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+
+def _save_meta(path, meta):
+    def write(tmp):
+        with open(tmp, "w") as f: json.dump(meta, f)
+    _replace_atomically(path + ".json", write)
+
+def _normalise(df):
+    """
+    Cast columns mixing numbers and "" (as get_all_records returns them) to str
+
+    Applied before a frame is both stored and returned, so a fresh download
+    and a later read of the Parquet mirror yield the same dtypes.
+    """
+    mixed = [c for c in df.select_dtypes(include="object").columns
+             if not df[c].map(lambda v: isinstance(v, str)).all()]
+    return df.astype({c: str for c in mixed}) if mixed else df
+
+def _store_mirror(path, df, revision):
+    """Atomically write the frame and its revision so other processes never see half a file"""
+    os.makedirs(MIRROR_DIR, exist_ok=True)
+    _replace_atomically(path + ".parquet", lambda tmp: df.to_parquet(tmp, index=False))
+    _save_meta(path, {"revision": revision, "checked_at": time.time()})
+
+def _mirror_read(sheet_name, worksheet_name):
+    """Serve from disk, revalidating against Drive and downloading only on a new revision"""
+    path = _mirror_path(sheet_name, worksheet_name)
+    meta = _load_meta(path)
+    has_copy = meta and os.path.exists(path + ".parquet")
+
+    if has_copy and time.time() - meta.get("checked_at", 0) < REVALIDATE_SECONDS:
+        revision = meta["revision"]
+    else:
+        spreadsheet = _open_spreadsheet(sheet_name)
+        revision = _revision(spreadsheet)
+        if not has_copy or revision != meta.get("revision"):
+            df = _normalise(pd.DataFrame(spreadsheet.worksheet(worksheet_name).get_all_records()))
+            _store_mirror(path, df, revision)
+            _memory[path] = (revision, df)
+            return df.copy()
+        _save_meta(path, {"revision": revision, "checked_at": time.time()})
+
+    cached = _memory.get(path)
+    if not cached or cached[0] != revision:
+        cached = (revision, pd.read_parquet(path + ".parquet"))
+        _memory[path] = cached
+    return cached[1].copy()
+
+def invalidate_mirror(sheet_name, worksheet_name):
+    """Force the next read of this worksheet to revalidate with Drive"""
+    path = _mirror_path(sheet_name, worksheet_name)
+    _memory.pop(path, None)
+    if os.path.exists(path + ".json"): _save_meta(path, {"revision": None, "checked_at": 0})
+
+def _with_backoff(read):
     for i in range(5):  # Try 5 times
         try:
-            # Key based on 5-minute window
-            cache_key = datetime.now().strftime("%Y%m%d%H%M")[:-1]
-            return _cached_read_sheet(sheet_name, worksheet_name, cache_key)
+            return read()
         except Exception as e:
             if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
                 wait_time = (2 ** i) + random.random()
@@ -43,6 +140,21 @@ def read_sheet_safe(sheet_name, worksheet_name):
             raise e
     raise Exception("Max retries exceeded for Google Sheets API")
 
+def read_sheet(sheet_name, worksheet_name):
+    """Read data with exponential backoff for rate limit protection"""
+    return _with_backoff(lambda: _mirror_read(sheet_name, worksheet_name))
+
+def read_sheet_fresh(sheet_name, worksheet_name):
+    """
+    Read straight from Sheets, bypassing the mirror and shared frames
+
+    For read-modify-write paths: update_sheet rewrites the whole worksheet,
+    so the frame it is given must not be missing recent writes.
+    """
+    return _with_backoff(lambda: _normalise(pd.DataFrame(open_worksheet(sheet_name, worksheet_name).get_all_records())))
+
+read_sheet_safe = read_sheet
+
 def update_sheet(sheet_name, worksheet_name, df):
     """Update Google Sheet with rate limiting"""
     try:
@@ -51,14 +163,14 @@ def update_sheet(sheet_name, worksheet_name, df):
         if last_update:
             diff = (datetime.now() - last_update).total_seconds()
             if diff < 2: time.sleep(2 - diff)
-            
-        client = init_google_sheets()
-        worksheet = client.open(sheet_name).worksheet(worksheet_name)
-        
+
+        worksheet = open_worksheet(sheet_name, worksheet_name)
+
         worksheet.clear()
         worksheet.update('A1', [df.columns.tolist()] + df.values.tolist())
-            
+
         update_sheet._last_update = datetime.now()
-        _cached_read_sheet.cache_clear()
+        invalidate_mirror(sheet_name, worksheet_name)
+        invalidate_shared(worksheet_name)
     except Exception as e:
-        raise Exception(f"Update Failed: {e}")
\ No newline at end of file
+        raise Exception(f"Update Failed: {e}")
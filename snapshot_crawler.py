@@ -0,0 +1,124 @@
+"""
+Full-market snapshot crawler
+
+Prices every catalog item through the batch endpoint and writes one Parquet
+file per day:
+
+    python snapshot_crawler.py --workers 4
+
+Chunks are checkpointed as they land, so re-running the same command after a
+crash or rate-limit stall only fetches the chunks that are still missing.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+from steamdt_api import SteamdtAPI
+from price_refresh import BATCH_SIZE, chunked, fetch_quotes
+from name_resolver import DB_FILE, load_catalog
+
+load_dotenv()
+
+SNAPSHOT_DIR = "snapshots"
+# Consecutive empty chunks before a worker assumes it is rate limited and stops
+MAX_STALLS = 5
+
+def snapshot_path(date: str, out_dir: str = SNAPSHOT_DIR) -> str:
+    return os.path.join(out_dir, f"snapshot_{date}.parquet")
+
+def _chunk_path(parts_dir: str, index: int) -> str:
+    return os.path.join(parts_dir, f"chunk_{index:05d}.parquet")
+
+def _crawl_shard(args):
+    """Worker: fetch this shard's chunks, skipping any already checkpointed"""
+    api_key, chunks, parts_dir, stamp = args
+    api = SteamdtAPI(api_key)
+    done, stalls = 0, 0
+    for index, names in chunks:
+        path = _chunk_path(parts_dir, index)
+        if os.path.exists(path): continue
+
+        quotes, failed = fetch_quotes(api, names)
+        if quotes.empty:
+            stalls += 1
+            if stalls >= MAX_STALLS: break
+            time.sleep(min(60, 2 ** stalls))
+            continue
+        stalls = 0
+
+        frame = pd.DataFrame({"Date": stamp, "Item Name": names})
+        frame["Price (CNY)"] = frame["Item Name"].map(quotes["price"])
+        frame["Supply"] = frame["Item Name"].map(quotes["supply"]).astype("Int64")
+        # Write then rename so a killed worker never leaves a half-written checkpoint
+        frame.to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        done += len(names) - len(failed)
+    return done
+
+def crawl(api_key: str, names, date: str, out_dir: str = SNAPSHOT_DIR,
+          workers: int = 4, batch_size: int = BATCH_SIZE):
+    """
+    Crawl the catalog into a single snapshot file
+
+    Returns:
+        (snapshot path or None if incomplete, items priced this run, chunks still missing)
+    """
+    parts_dir = os.path.join(out_dir, f"snapshot_{date}.parts")
+    os.makedirs(parts_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    chunks = list(enumerate(chunked(names, batch_size)))
+    todo = [c for c in chunks if not os.path.exists(_chunk_path(parts_dir, c[0]))]
+    # Round-robin shards keep every worker busy until the end
+    shards = [(api_key, todo[i::workers], parts_dir, stamp) for i in range(workers) if todo[i::workers]]
+
+    priced = 0
+    if shards:
+        with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+            priced = sum(pool.map(_crawl_shard, shards))
+
+    missing = [i for i, _ in chunks if not os.path.exists(_chunk_path(parts_dir, i))]
+    if missing: return None, priced, missing
+
+    snapshot = pd.concat((pd.read_parquet(_chunk_path(parts_dir, i)) for i, _ in chunks), ignore_index=True)
+    path = snapshot_path(date, out_dir)
+    snapshot.to_parquet(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+    shutil.rmtree(parts_dir)
+    return path, priced, []
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot price/supply for the whole catalog")
+    parser.add_argument("--api-key", default=os.getenv("STEAMDT_API_KEY"))
+    parser.add_argument("--catalog", default=DB_FILE)
+    parser.add_argument("--out-dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--date", default=datetime.now().strftime("%Y-%m-%d"), help="Snapshot (and resume) key")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        print("Missing API key: pass --api-key or set STEAMDT_API_KEY")
+        return 1
+
+    names = load_catalog(args.catalog)
+    start = time.time()
+    path, priced, missing = crawl(args.api_key, names, args.date, args.out_dir, args.workers, args.batch_size)
+    elapsed = time.time() - start
+
+    print(f"Priced {priced} items in {elapsed:.1f}s ({priced / max(elapsed, 1e-9):.1f} items/s)")
+    if path:
+        snapshot = pd.read_parquet(path, columns=["Price (CNY)"])
+        covered = int(snapshot["Price (CNY)"].notna().sum())
+        print(f"✅ {path}: {covered}/{len(names)} items priced ({covered / max(len(names), 1):.1%} coverage)")
+        return 0
+    print(f"⚠️ {len(missing)} chunk(s) still missing, re-run with --date {args.date} to resume")
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
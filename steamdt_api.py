@@ -1,10 +1,13 @@
 import requests
 import json
 import os
+import numpy as np
 from datetime import datetime
-from typing import Dict, List, Optional, TypedDict
-from pydantic import BaseModel
+from typing import Dict, List, Optional, Tuple
+from typing_extensions import TypedDict
+from pydantic import BaseModel, ValidationError
 from dotenv import load_dotenv
+from steamdt_resilience import UpstreamError, get_guard
 
 load_dotenv()
 
@@ -15,13 +18,111 @@ class PriceData(TypedDict):
 
 class ItemResponse(BaseModel):
     success: bool
-    data: Optional[List[PriceData]]
-    errorMsg: Optional[str]
+    data: Optional[List[PriceData]] = None
+    errorMsg: Optional[str] = None
+
+class BatchItem(BaseModel):
+    marketHashName: str
+    dataList: List[PriceData]
+
+class BatchResponse(BaseModel):
+    success: bool
+    data: Optional[List[BatchItem]] = None
+    errorMsg: Optional[str] = None
 
 class SteamdtAPIException(Exception):
     """Custom exception for SteamDT API errors"""
     pass
 
+# Platform names are interned to small integer codes as they are first seen
+PLATFORMS: List[str] = []
+_PLATFORM_CODES: Dict[str, int] = {}
+
+def platform_code(platform: str) -> int:
+    code = _PLATFORM_CODES.get(platform)
+    if code is None:
+        code = _PLATFORM_CODES[platform] = len(PLATFORMS)
+        PLATFORMS.append(platform)
+    return code
+
+class PriceColumns:
+    """
+    Column-oriented price listings for one or more items
+
+    Listings for item i live in rows offsets[i]:offsets[i + 1] of the
+    price/count/platform arrays. `cached` is set when the listings are the
+    last good response replayed while Steamdt is unavailable.
+    """
+    __slots__ = ("names", "offsets", "price", "count", "platform", "cached")
+
+    def __init__(self, names: List[str], offsets: np.ndarray, price: np.ndarray,
+                 count: np.ndarray, platform: np.ndarray, cached: bool = False):
+        self.names = names
+        self.offsets = offsets
+        self.price = price
+        self.count = count
+        self.platform = platform
+        self.cached = cached
+
+    def __len__(self):
+        return len(self.names)
+
+    def as_cached(self) -> "PriceColumns":
+        """Same listings (arrays shared, not copied) flagged as served from cache"""
+        return PriceColumns(self.names, self.offsets, self.price, self.count, self.platform, cached=True)
+
+    def quotes(self, preferred: str = "BUFF") -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        One quote per item: the preferred platform's sell price (first
+        listing as fallback, NaN if none) and total listings across platforms
+        """
+        n = len(self.names)
+        sizes = np.diff(self.offsets)
+        owner = np.repeat(np.arange(n), sizes)
+        supply = np.bincount(owner, weights=self.count, minlength=n).astype(np.int64)
+
+        price = np.full(n, np.nan)
+        listed = sizes > 0
+        price[listed] = self.price[self.offsets[:-1][listed]]
+        if preferred in _PLATFORM_CODES:
+            hit = np.flatnonzero(self.platform == _PLATFORM_CODES[preferred])[::-1]
+            # Reversed so the first preferred listing wins when an item has several
+            price[owner[hit]] = self.price[hit]
+        return self.names, price, supply
+
+def _columns(names: List[str], listings: List[List[PriceData]]) -> PriceColumns:
+    """Copy validated listings into preallocated column arrays"""
+    offsets = np.zeros(len(listings) + 1, dtype=np.int64)
+    np.cumsum([len(rows) for rows in listings], out=offsets[1:])
+    total = int(offsets[-1])
+    flat = [entry for rows in listings for entry in rows]
+    # fromiter with a known count fills one preallocated buffer per column
+    price = np.fromiter((e["sellPrice"] for e in flat), dtype=np.float64, count=total)
+    count = np.fromiter((e["sellCount"] for e in flat), dtype=np.int64, count=total)
+    platform = np.fromiter((platform_code(e["platform"]) for e in flat), dtype=np.int16, count=total)
+    return PriceColumns(names, offsets, price, count, platform)
+
+def decode_price(raw: bytes, market_hash_name: str) -> PriceColumns:
+    """Validate a single-price response straight from bytes (pydantic-core JSON parser)"""
+    try:
+        resp = ItemResponse.model_validate_json(raw)
+    except ValidationError as e:
+        raise SteamdtAPIException(f"Malformed price response for {market_hash_name}: {e}") from e
+    if not resp.success:
+        raise SteamdtAPIException(f"API Error: {resp.errorMsg}")
+    return _columns([market_hash_name], [resp.data or []])
+
+def decode_batch(raw: bytes) -> PriceColumns:
+    """Validate a batch-price response straight from bytes (pydantic-core JSON parser)"""
+    try:
+        resp = BatchResponse.model_validate_json(raw)
+    except ValidationError as e:
+        raise SteamdtAPIException(f"Malformed batch response: {e}") from e
+    if not resp.success:
+        raise SteamdtAPIException(f"API Error: {resp.errorMsg}")
+    items = resp.data or []
+    return _columns([i.marketHashName for i in items], [i.dataList for i in items])
+
 class SteamdtAPI:
     """Steamdt.com API client for CS2 item monitoring"""
     
@@ -39,8 +140,24 @@ class SteamdtAPI:
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
+        self.guard = get_guard("steamdt")
+
+    def _fetch(self, key, send, decode):
+        """
+        Send through the shared guard and decode, falling back to the last
+        good result for `key` (flagged `.cached`) while the upstream is failing
+        """
+        try:
+            response = self.guard.request(send)
+        except UpstreamError as e:
+            cached = self.guard.cached(key)
+            if cached is None: raise SteamdtAPIException(f"Steamdt unavailable: {e}") from e
+            return cached.as_cached()
+        value = decode(response.content)
+        self.guard.remember(key, value)
+        return value
     
-    def get_item_price(self, market_hash_name: str) -> Optional[Dict]:
+    def get_item_price(self, market_hash_name: str) -> PriceColumns:
         """
         Get current price for a CS2 item
         
@@ -48,24 +165,20 @@ class SteamdtAPI:
             market_hash_name: Item market hash name (e.g., "AK-47 | Phantom Disruptor (Field-Tested)")
             
         Returns:
-            Dictionary with price data or None if error
+            Per-platform listings for the item (`.cached` if replayed from cache)
+
+        Raises:
+            SteamdtAPIException: On API errors, malformed payloads, or an unhealthy
+                upstream with nothing cached for this request
         """
-        try:
-            url = f"{self.BASE_URL}/open/cs2/v1/price"
-            params = {"marketHashName": market_hash_name}
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            data = response.json()
-            
-            if data.get("success"):
-                return data.get("data", {})
-            else:
-                print(f"API Error: {data.get('errorMsg')}")
-                return None
-        except Exception as e:
-            print(f"Error fetching price for {market_hash_name}: {e}")
-            return None
+        url = f"{self.BASE_URL}/open/cs2/v1/price"
+        params = {"marketHashName": market_hash_name}
+        return self._fetch(
+            ("price", market_hash_name),
+            lambda timeout: requests.get(url, headers=self.headers, params=params, timeout=timeout),
+            lambda raw: decode_price(raw, market_hash_name))
     
-    def get_batch_prices(self, market_hash_names: List[str]) -> Optional[Dict]:
+    def get_batch_prices(self, market_hash_names: List[str]) -> PriceColumns:
         """
         Get prices for multiple items in one request
         
@@ -73,22 +186,18 @@ class SteamdtAPI:
             market_hash_names: List of market hash names
             
         Returns:
-            Dictionary with batch price data or None if error
+            Per-platform listings for every item the API returned (`.cached` if replayed from cache)
+
+        Raises:
+            SteamdtAPIException: On API errors, malformed payloads, or an unhealthy
+                upstream with nothing cached for this request
         """
-        try:
-            url = f"{self.BASE_URL}/open/cs2/v1/batch/price"
-            payload = {"marketHashNames": market_hash_names}
-            response = requests.post(url, headers=self.headers, json=payload, timeout=10)
-            data = response.json()
-            
-            if data.get("success"):
-                return data.get("data", {})
-            else:
-                print(f"API Error: {data.get('errorMsg')}")
-                return None
-        except Exception as e:
-            print(f"Error fetching batch prices: {e}")
-            return None
+        url = f"{self.BASE_URL}/open/cs2/v1/batch/price"
+        payload = {"marketHashNames": market_hash_names}
+        return self._fetch(
+            ("batch", tuple(market_hash_names)),
+            lambda timeout: requests.post(url, headers=self.headers, json=payload, timeout=timeout),
+            decode_batch)
     
     def get_average_price(self, market_hash_name: str) -> Optional[Dict]:
         """
@@ -0,0 +1,251 @@
+import os
+import time
+import random
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+import requests
+
+# Whole-call deadline, covering hedges and retries
+TIMEOUT_SECONDS = float(os.getenv("STEAMDT_TIMEOUT", "10"))
+# Hedge delay until enough latencies have been seen to estimate p95
+DEFAULT_HEDGE_SECONDS = 1.0
+MIN_LATENCY_SAMPLES = 20
+MAX_RETRIES = 2
+BACKOFF_SECONDS = 0.25
+# Breaker opens after this many consecutive failures and probes again after RESET_SECONDS
+FAILURE_THRESHOLD = 5
+RESET_SECONDS = 30.0
+# Responses kept per guard to serve while the upstream is unhealthy
+CACHE_ENTRIES = 4096
+
+class UpstreamError(Exception):
+    """Transport failure, timeout, 429/5xx, or an open circuit"""
+    pass
+
+class LatencyTracker:
+    """Rolling window of successful request latencies"""
+
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self.lock:
+            ordered = sorted(self.samples)
+        if not ordered: return None
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def hedge_delay(self) -> float:
+        if len(self.samples) < MIN_LATENCY_SAMPLES: return DEFAULT_HEDGE_SECONDS
+        return max(self.percentile(0.95), 0.05)
+
+class RetryBudget:
+    """
+    Token bucket shared by retries and hedges
+
+    Each success deposits `ratio` tokens and each extra request spends one,
+    so extra load stays around `ratio` of the successful traffic and dries
+    up on its own during an outage.
+    """
+
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.lock = threading.Lock()
+
+    def deposit(self):
+        with self.lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self.lock:
+            if self.tokens < 1: return False
+            self.tokens -= 1
+            return True
+
+class CircuitBreaker:
+    """closed -> open after consecutive failures -> half_open single probe -> closed/open"""
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_after: float = RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_after:
+                self.state = "half_open"
+            if self.state == "closed": return True
+            if self.state == "half_open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record(self, ok: bool):
+        with self.lock:
+            self.probing = False
+            if ok:
+                self.state, self.failures = "closed", 0
+                return
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open": self.times_opened += 1
+                self.state, self.opened_at = "open", time.monotonic()
+
+class Guard:
+    """
+    Hedging, retry budget, circuit breaker and last-good cache for one upstream
+
+    Args:
+        name: Label shown in stats
+        workers: Threads available for in-flight requests and hedges
+    """
+
+    def __init__(self, name: str, workers: int = 8):
+        self.name = name
+        self.latency = LatencyTracker()
+        self.budget = RetryBudget()
+        self.breaker = CircuitBreaker()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-hedge")
+        self.cache: "OrderedDict[Any, Any]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "hedges": 0, "hedge_wins": 0, "retries": 0,
+                       "failures": 0, "rejected": 0, "served_cached": 0}
+
+    def _count(self, key: str):
+        with self.lock:
+            self.counts[key] += 1
+
+    def _timed(self, send: Callable[[float], requests.Response], timeout: float) -> requests.Response:
+        start = time.monotonic()
+        try:
+            response = send(max(timeout, 0.1))
+        except requests.RequestException as e:
+            raise UpstreamError(str(e)) from e
+        if response.status_code == 429 or response.status_code >= 500:
+            raise UpstreamError(f"HTTP {response.status_code}")
+        self.latency.record(time.monotonic() - start)
+        return response
+
+    def _hedged(self, send: Callable[[float], requests.Response], deadline: float) -> requests.Response:
+        """First good response from the request or its hedge, sent once the first outlives p95"""
+        self._count("requests")
+        primary = self.pool.submit(self._timed, send, deadline - time.monotonic())
+        pending, hedge = {primary}, None
+        done, _ = wait(pending, timeout=min(self.latency.hedge_delay(), max(deadline - time.monotonic(), 0)))
+        if not done and time.monotonic() < deadline and self.budget.withdraw():
+            self._count("hedges")
+            hedge = self.pool.submit(self._timed, send, deadline - time.monotonic())
+            pending.add(hedge)
+
+        error: Optional[UpstreamError] = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0: break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except UpstreamError as e:
+                    error = e
+                    continue
+                if future is hedge: self._count("hedge_wins")
+                return response
+        # Losers keep running in the pool; their results are simply dropped
+        raise error or UpstreamError(f"No response within {TIMEOUT_SECONDS:g}s")
+
+    def request(self, send: Callable[[float], requests.Response], timeout: float = TIMEOUT_SECONDS) -> requests.Response:
+        """
+        Run `send(timeout)` with hedging and budgeted, jittered retries
+
+        Raises:
+            UpstreamError: Circuit open, retry budget spent, or deadline reached
+        """
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise UpstreamError(f"{self.name} circuit open")
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            try:
+                response = self._hedged(send, deadline)
+            except UpstreamError:
+                self._count("failures")
+                self.breaker.record(False)
+                attempt += 1
+                remaining = deadline - time.monotonic()
+                if attempt > MAX_RETRIES or remaining <= 0 or not self.budget.withdraw() or not self.breaker.allow():
+                    raise
+                self._count("retries")
+                # Full jitter keeps many sessions from retrying in lockstep
+                time.sleep(min(remaining, random.uniform(0, BACKOFF_SECONDS * 2 ** attempt)))
+                continue
+            self.breaker.record(True)
+            self.budget.deposit()
+            return response
+
+    def remember(self, key, value):
+        with self.lock:
+            self.cache[key] = value
+            self.cache.move_to_end(key)
+            while len(self.cache) > CACHE_ENTRIES: self.cache.popitem(last=False)
+
+    def cached(self, key):
+        """Last good value for `key`, counted as served-from-cache; None if never fetched"""
+        with self.lock:
+            value = self.cache.get(key)
+        if value is not None: self._count("served_cached")
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            counts = dict(self.counts)
+        p50, p95 = self.latency.percentile(0.5), self.latency.percentile(0.95)
+        return {
+            "upstream": self.name,
+            "breaker": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "times_opened": self.breaker.times_opened,
+            **counts,
+            "hedge_rate": counts["hedges"] / counts["requests"] if counts["requests"] else 0.0,
+            "retry_tokens": round(self.budget.tokens, 2),
+            "p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "cached_entries": len(self.cache),
+        }
+
+_GUARDS: Dict[str, Guard] = {}
+_GUARDS_LOCK = threading.Lock()
+
+def get_guard(name: str = "steamdt") -> Guard:
+    """Process-wide guard per upstream, shared by every client and session"""
+    with _GUARDS_LOCK:
+        if name not in _GUARDS: _GUARDS[name] = Guard(name)
+        return _GUARDS[name]
+
+def show_resilience_stats():
+    import streamlit as st
+    with st.expander("🛡️ Upstream Health"):
+        if not _GUARDS:
+            st.caption("No upstream calls made yet.")
+            return
+        for guard in list(_GUARDS.values()):
+            s = guard.stats()
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric(f"{s['upstream']} Breaker", s["breaker"].replace("_", "-").upper())
+            c2.metric("Hedge Rate", f"{s['hedge_rate'] * 100:.1f}%", f"{s['hedge_wins']} won", delta_color="off")
+            c3.metric("p95 Latency", f"{s['p95_ms']} ms" if s["p95_ms"] is not None else "—")
+            c4.metric("Served From Cache", s["served_cached"])
+            st.json(s, expanded=False)
@@ -0,0 +1,207 @@
+import os
+import threading
+import pandas as pd
+import streamlit as st
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Tracked but not owned: counted per Type, left out of book value and P&L
+WATCH_TYPES = {"Watchlist"}
+
+def _fen(price) -> int:
+    """Price in integer fen (CNY cents) so running sums never drift"""
+    try:
+        value = float(price)
+    except (TypeError, ValueError):
+        return 0
+    return round(value * 100) if value == value else 0
+
+class PortfolioValuation:
+    """
+    Running portfolio totals updated per price tick
+
+    Book value, cost basis and per-Type aggregates are kept as integer-fen
+    sums. A tick for an item adjusts them by (new - old) x quantity for
+    each position holding it, so a refresh costs O(ticks) rather than a
+    pass over the whole book, and `verify()` can compare against a full
+    recompute exactly.
+    """
+
+    def __init__(self, df: pd.DataFrame, price_col: str = "Price (CNY)", cost_col: str = "AT Price",
+                 type_col: str = "Type", name_col: str = "Item Name", qty_col: str = "Quantity"):
+        self.names: List[str] = []
+        self.types: List[str] = []
+        self.qty: List[int] = []
+        self.cost: List[int] = []
+        self.price: List[int] = []
+        self.by_name: Dict[str, List[int]] = {}
+        self.value_total = self.cost_total = 0
+        self.type_value: Dict[str, int] = {}
+        self.type_cost: Dict[str, int] = {}
+        self.type_count: Dict[str, int] = {}
+
+        quantities = df[qty_col] if qty_col in df.columns else pd.Series(1, index=df.index)
+        for name, kind, cost, price, qty in zip(df[name_col], df[type_col], df[cost_col], df[price_col], quantities):
+            self.add_position(str(name), str(kind), cost, price, qty)
+
+    def add_position(self, name: str, kind: str, cost, price, qty=1):
+        pid = len(self.names)
+        qty = int(qty) if pd.notna(qty) else 1
+        self.names.append(name)
+        self.types.append(kind)
+        self.qty.append(qty)
+        self.cost.append(_fen(cost))
+        self.price.append(_fen(price))
+        self.by_name.setdefault(name, []).append(pid)
+        self.type_count[kind] = self.type_count.get(kind, 0) + 1
+        self._shift(kind, self.price[pid] * qty, self.cost[pid] * qty)
+
+    def _shift(self, kind: str, value: int, cost: int):
+        self.type_value[kind] = self.type_value.get(kind, 0) + value
+        self.type_cost[kind] = self.type_cost.get(kind, 0) + cost
+        if kind not in WATCH_TYPES:
+            self.value_total += value
+            self.cost_total += cost
+
+    def apply_tick(self, name: str, price) -> bool:
+        """Move every position in `name` to the new price; False if not held"""
+        pids = self.by_name.get(name)
+        if not pids: return False
+        new = _fen(price)
+        for pid in pids:
+            delta = (new - self.price[pid]) * self.qty[pid]
+            if delta: self._shift(self.types[pid], delta, 0)
+            self.price[pid] = new
+        return True
+
+    def apply_ticks(self, ticks: Iterable[Tuple[str, float]]) -> int:
+        return sum(self.apply_tick(name, price) for name, price in ticks)
+
+    def totals(self) -> Dict[str, float]:
+        pnl = self.value_total - self.cost_total
+        return {
+            "value": self.value_total / 100,
+            "cost": self.cost_total / 100,
+            "pnl": pnl / 100,
+            "pnl_pct": pnl / self.cost_total * 100 if self.cost_total else 0.0,
+        }
+
+    def by_type(self) -> pd.DataFrame:
+        rows = [{
+            "Type": kind,
+            "Positions": self.type_count[kind],
+            "Value": self.type_value[kind] / 100,
+            "Cost": self.type_cost[kind] / 100,
+            "P&L": (self.type_value[kind] - self.type_cost[kind]) / 100,
+        } for kind in self.type_count]
+        return pd.DataFrame(rows, columns=["Type", "Positions", "Value", "Cost", "P&L"])
+
+    def by_group(self, key: Callable[[str], str], label: str = "Group") -> pd.DataFrame:
+        """Owned positions aggregated by `key(item name)`, e.g. a facet such as weapon or wear"""
+        value: Dict[str, int] = {}
+        cost: Dict[str, int] = {}
+        count: Dict[str, int] = {}
+        for name, kind, qty, c, p in zip(self.names, self.types, self.qty, self.cost, self.price):
+            if kind in WATCH_TYPES: continue
+            group = key(name)
+            count[group] = count.get(group, 0) + 1
+            value[group] = value.get(group, 0) + p * qty
+            cost[group] = cost.get(group, 0) + c * qty
+        rows = [{label: g, "Positions": count[g], "Value": value[g] / 100, "Cost": cost[g] / 100,
+                 "P&L": (value[g] - cost[g]) / 100} for g in count]
+        return pd.DataFrame(rows, columns=[label, "Positions", "Value", "Cost", "P&L"]).sort_values("Value", ascending=False)
+
+    def recompute(self) -> Tuple[int, int, Dict[str, int]]:
+        """Full pass over every position: (book value, book cost, value per Type) in fen"""
+        value = cost = 0
+        per_type: Dict[str, int] = {}
+        for kind, qty, c, p in zip(self.types, self.qty, self.cost, self.price):
+            per_type[kind] = per_type.get(kind, 0) + p * qty
+            if kind not in WATCH_TYPES:
+                value += p * qty
+                cost += c * qty
+        return value, cost, per_type
+
+    def verify(self, df: Optional[pd.DataFrame] = None, price_col: str = "Price (CNY)",
+               name_col: str = "Item Name") -> List[str]:
+        """
+        Compare running sums to a full recompute
+
+        Args:
+            df: Optional frame to also check stored prices against (e.g. portfolio.csv)
+
+        Returns:
+            Human readable mismatches, empty when consistent
+        """
+        issues = []
+        value, cost, per_type = self.recompute()
+        if value != self.value_total: issues.append(f"Book value {self.value_total / 100} != {value / 100}")
+        if cost != self.cost_total: issues.append(f"Book cost {self.cost_total / 100} != {cost / 100}")
+        for kind, total in per_type.items():
+            if total != self.type_value.get(kind):
+                issues.append(f"{kind} value {self.type_value.get(kind, 0) / 100} != {total / 100}")
+        if df is not None:
+            latest = dict(zip(df[name_col].astype(str), df[price_col]))
+            for name, pids in self.by_name.items():
+                if name in latest and _fen(latest[name]) != self.price[pids[0]]:
+                    issues.append(f"{name} price {self.price[pids[0]] / 100} != {latest[name]}")
+        return issues
+
+def _read_positions(path: str) -> pd.DataFrame:
+    columns = ["Item Name", "Type", "AT Price", "Price (CNY)"]
+    if not os.path.exists(path): return pd.DataFrame(columns=columns)
+    df = pd.read_csv(path)
+    for col in columns:
+        if col not in df.columns: df[col] = 0
+    return df
+
+class SharedValuation:
+    """
+    One running valuation per portfolio file, shared by every session
+
+    Rebuilt from disk whenever the file's mtime moves under it; writers go
+    through `writing()` so their own saves don't count as outside changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.RLock()
+        self.valuation: Optional[PortfolioValuation] = None
+        self.mtime: Optional[float] = None
+
+    def _disk_mtime(self) -> Optional[float]:
+        return os.path.getmtime(self.path) if os.path.exists(self.path) else None
+
+    def _sync(self):
+        mtime = self._disk_mtime()
+        if self.valuation is None or mtime != self.mtime:
+            self.valuation = PortfolioValuation(_read_positions(self.path))
+            self.mtime = mtime
+
+    def get(self) -> PortfolioValuation:
+        """Valuation matching the file as it is on disk now"""
+        with self.lock:
+            self._sync()
+            return self.valuation
+
+    @contextmanager
+    def writing(self) -> Iterator[PortfolioValuation]:
+        """
+        Hold the valuation while updating it and saving the file
+
+        Changes made inside the block must be the same ones written to disk;
+        the file's new mtime is then adopted instead of triggering a rebuild.
+        """
+        with self.lock:
+            self._sync()
+            try:
+                yield self.valuation
+            except BaseException:
+                # Half-applied updates: rebuild from disk on next use
+                self.valuation = None
+                raise
+            self.mtime = self._disk_mtime()
+
+@st.cache_resource
+def get_valuation(path: str) -> SharedValuation:
+    return SharedValuation(path)